@@ -0,0 +1,318 @@
+#! -- coding: utf-8 --
+"""
+Local stand-in for a Linkwarden server, used by the benchmarks
+
+It serves generated data for the endpoints exercised by the benchmarks, with a configurable
+latency per request and configurable payload sizes, so the numbers measure the client and
+not a real instance. Run it on its own with:
+
+    python -m benchmarks.mock_server --port 8080 --latency 20 --links 10000
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, Iterator, List, Optional
+from urllib.parse import urlparse, parse_qs
+
+_LINK_PATH = re.compile(r"^/api/v1/links/(\d+)$")
+_ARCHIVE_PATH = re.compile(r"^/api/v1/archives/(\d+)$")
+
+
+class MockConfig:
+    """
+    Shape of the data served and simulated network conditions
+
+    Args:
+        links: Number of links in the account, with IDs links..1
+        collections: Number of collections the links are spread over
+        tags: Number of tags, each link has up to tags_per_link of them
+        tags_per_link: Maximum number of tags per link
+        page_size: Number of links per page of the search and public endpoints
+        text_size: Size in bytes of the description of each link (grows the payloads)
+        archive_size: Size in bytes of the archive files
+        latency: Delay in milliseconds added before each response
+        jitter: Random extra delay in milliseconds, between 0 and jitter
+    """
+    def __init__(self,
+                 links: int = 10000,
+                 collections: int = 20,
+                 tags: int = 50,
+                 tags_per_link: int = 3,
+                 page_size: int = 50,
+                 text_size: int = 200,
+                 archive_size: int = 1024 * 1024,
+                 latency: float = 0,
+                 jitter: float = 0
+                 ):
+        self.links = links
+        self.collections = collections
+        self.tags = tags
+        self.tags_per_link = tags_per_link
+        self.page_size = page_size
+        self.text_size = text_size
+        self.archive_size = archive_size
+        self.latency = latency
+        self.jitter = jitter
+
+
+class MockServer:
+    """
+    The mock server, running in a background thread
+
+    Usable as a context manager. Counters of the requests received per endpoint are kept in
+    requests, the bytes of the uploads in uploaded_bytes.
+
+    Args:
+        config: MockConfig, defaults to MockConfig()
+        host: Interface to listen on
+        port: Port to listen on, 0 for any free port
+    """
+    def __init__(self, config: Optional[MockConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config if config is not None else MockConfig()
+        self.requests = {}
+        self.uploaded_bytes = 0
+        self._lock = threading.Lock()
+        self.archive = bytes(range(256)) * (self.config.archive_size // 256 + 1)
+        self.archive = self.archive[:self.config.archive_size]
+
+        handler = type("Handler", (_Handler,), {"server_state": self})
+        self._httpd = _Server((host, port), handler)
+        self._thread = None
+
+
+    @property
+    def base_url(self) -> str:
+        """URL to give to Api(base_url=...)"""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+    def start(self) -> "MockServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+
+    def __enter__(self):
+        return self.start()
+
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+    def count(self, key: str, uploaded: int = 0):
+        with self._lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.uploaded_bytes += uploaded
+
+
+    def link(self, id: int) -> Dict[str, Any]:
+        """The generated link with the given ID, the same on every call"""
+        config = self.config
+        collection_id = id % config.collections + 1
+        tag_count = id % (config.tags_per_link + 1)
+        return {
+            "id": id,
+            "name": f"Link {id}",
+            "type": "url",
+            "description": ("lorem ipsum " * (config.text_size // 12 + 1))[:config.text_size],
+            "url": f"https://example.com/articles/{id}",
+            "collectionId": collection_id,
+            "createdById": 1,
+            "createdAt": "2024-01-01T00:00:00.000Z",
+            "updatedAt": "2024-06-01T00:00:00.000Z",
+            "collection": {"id": collection_id, "name": f"Collection {collection_id}", "ownerId": 1, "color": "#0ea5e9"},
+            "tags": [self.tag((id + n) % config.tags + 1) for n in range(tag_count)],
+            "pinnedBy": [],
+        }
+
+
+    def tag(self, id: int) -> Dict[str, Any]:
+        return {"id": id, "name": f"tag-{id}", "ownerId": 1, "createdAt": "2024-01-01T00:00:00.000Z", "updatedAt": "2024-01-01T00:00:00.000Z"}
+
+
+    def page(self, cursor: int) -> List[Dict[str, Any]]:
+        """Links after the cursor, newest first, like the search endpoint"""
+        start = self.config.links if not cursor else min(cursor - 1, self.config.links)
+        return [self.link(id) for id in range(start, max(start - self.config.page_size, 0), -1)]
+
+
+    def export_chunks(self) -> Iterator[bytes]:
+        """Body of the migration export, generated collection by collection"""
+        config = self.config
+        yield b'{"id":1,"name":"Benchmark","username":"benchmark","collections":['
+        for index in range(config.collections):
+            collection_id = index + 1
+            links = [self.link(id) for id in range(collection_id, config.links + 1, config.collections)]
+            for link in links:
+                del link["collection"]
+            body = json.dumps({"id": collection_id, "name": f"Collection {collection_id}", "links": links})
+            yield ("," if index else "").encode() + body.encode()
+        yield b"]}"
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Room for the connections opened at once by the concurrent scenarios
+    request_queue_size = 256
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, without it Nagle's algorithm delays every response by ~40 ms
+    disable_nagle_algorithm = True
+    server_state = None
+
+    def log_message(self, *args):
+        pass
+
+
+    def do_GET(self):
+        self._handle("GET")
+
+
+    def do_POST(self):
+        self._handle("POST")
+
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+    def _handle(self, method: str):
+        state = self.server_state
+        config = state.config
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        body = self._read_body()
+        state.count(f"{method} {_LINK_PATH.sub('/api/v1/links/{id}', _ARCHIVE_PATH.sub('/api/v1/archives/{id}', url.path))}", len(body))
+
+        if config.latency or config.jitter:
+            time.sleep((config.latency + random.uniform(0, config.jitter)) / 1000)
+
+        path = url.path
+        match = _LINK_PATH.match(path)
+        if match:
+            id = int(match.group(1))
+            if id < 1 or id > config.links:
+                return self._json(404, {"response": "Link not found."})
+            if method == "DELETE":
+                return self._json(200, {"response": {"id": id}})
+            return self._json(200, {"response": state.link(id)})
+
+        if path == "/api/v1/links":
+            if method == "POST":
+                data = json.loads(body or b"{}")
+                return self._json(200, {"response": dict(state.link(config.links + 1), **{key: value for key, value in data.items() if key in ("name", "url", "description")})})
+            if method == "PUT":
+                data = json.loads(body or b"{}")
+                return self._json(200, {"response": {"count": len(data.get("links") or [])}})
+            if method == "DELETE":
+                data = json.loads(body or b"{}")
+                return self._json(200, {"response": {"count": len(data.get("linkIds") or [])}})
+            return self._json(200, {"response": state.page(0)})
+
+        if path == "/api/v1/search":
+            links = state.page(int(query.get("cursor", ["0"])[0] or 0))
+            next_cursor = links[-1]["id"] if links and links[-1]["id"] > 1 else None
+            return self._json(200, {"data": {"links": links, "nextCursor": next_cursor}})
+
+        if path == "/api/v1/public/collections/links":
+            cursor = int(query.get("cursor", ["0"])[0] or 0)
+            return self._json(200, {"response": state.page(cursor)})
+
+        match = _ARCHIVE_PATH.match(path)
+        if match:
+            if method == "POST":
+                return self._json(200, {"response": {"size": len(body)}})
+            return self._bytes(200, state.archive, "application/pdf")
+
+        if path == "/api/v1/migration":
+            if method == "POST":
+                return self._json(200, {"response": "Success"})
+            return self._chunked(state.export_chunks(), "application/json")
+
+        self._json(404, {"response": "Not found"})
+
+
+    def _read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+            return b"".join(chunks)
+
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+
+    def _json(self, status: int, data: Any):
+        self._bytes(status, json.dumps(data).encode(), "application/json")
+
+
+    def _bytes(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+    def _chunked(self, chunks: Iterator[bytes], content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in chunks:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Linkwarden server for the benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--links", type=int, default=10000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--text-size", type=int, default=200, help="Size of the description of each link, in bytes")
+    parser.add_argument("--archive-size", type=int, default=1024 * 1024, help="Size of the archive files, in bytes")
+    parser.add_argument("--latency", type=float, default=0, help="Delay added to each response, in milliseconds")
+    parser.add_argument("--jitter", type=float, default=0, help="Random extra delay, in milliseconds")
+    args = parser.parse_args()
+
+    config = MockConfig(links=args.links, page_size=args.page_size, text_size=args.text_size,
+                        archive_size=args.archive_size, latency=args.latency, jitter=args.jitter)
+    server = MockServer(config, args.host, args.port)
+    print(f"Mock Linkwarden server listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
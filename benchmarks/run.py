@@ -0,0 +1,345 @@
+#! -- coding: utf-8 --
+"""
+Benchmark runner
+
+Starts the mock server and runs each scenario in a fresh process, so the peak RSS of one
+scenario isn't inflated by the previous ones. For each scenario it reports the number of
+operations, the throughput, the latency percentiles of its busiest endpoint (through LatencyStats)
+and the peak RSS, and can compare them with a previous run:
+
+    python -m benchmarks.run                             # all the scenarios
+    python -m benchmarks.run search_iter async_get_link  # only some of them
+    python -m benchmarks.run --latency 20 --json after.json --baseline before.json
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_server import MockConfig, MockServer
+
+SCENARIOS = {}
+
+
+def scenario(name: str, async_client: bool = False):
+    """Register a scenario: a function taking (api, options) and returning the number of operations done"""
+    def register(func: Callable):
+        SCENARIOS[name] = (func, async_client)
+        return func
+    return register
+
+
+@scenario("sync_get_link")
+def sync_get_link(api, options):
+    for id in range(1, options.requests + 1):
+        api.links.get_link(id)
+    return options.requests
+
+
+@scenario("threaded_get_link")
+def threaded_get_link(api, options):
+    with ThreadPoolExecutor(options.concurrency) as executor:
+        for _ in executor.map(api.links.get_link, range(1, options.requests + 1)):
+            pass
+    return options.requests
+
+
+@scenario("async_get_link", async_client=True)
+async def async_get_link(api, options):
+    semaphore = asyncio.Semaphore(options.concurrency)
+
+    async def get(id):
+        async with semaphore:
+            return await api.links.get_link(id)
+
+    await asyncio.gather(*(get(id) for id in range(1, options.requests + 1)))
+    return options.requests
+
+
+@scenario("search_iter")
+def search_iter(api, options):
+    return sum(1 for _ in api.search.iter_links(""))
+
+
+@scenario("search_iter_prefetch")
+def search_iter_prefetch(api, options):
+    return sum(1 for _ in api.search.iter_links("", prefetch=True))
+
+
+@scenario("search_iter_models")
+def search_iter_models(api, options):
+    # Keep the links, to measure the memory of the models
+    links = list(api.search.iter_links("", as_model=True))
+    return len(links)
+
+
+@scenario("search_iter_dicts")
+def search_iter_dicts(api, options):
+    links = list(api.search.iter_links(""))
+    return len(links)
+
+
+@scenario("async_search_iter", async_client=True)
+async def async_search_iter(api, options):
+    count = 0
+    async for _ in api.search.iter_links("", prefetch=True):
+        count += 1
+    return count
+
+
+@scenario("public_iter")
+def public_iter(api, options):
+    return sum(1 for _ in api.public.iter_links_from_collection(1, read_ahead=0))
+
+
+@scenario("public_iter_read_ahead")
+def public_iter_read_ahead(api, options):
+    return sum(1 for _ in api.public.iter_links_from_collection(1, read_ahead=2))
+
+
+@scenario("create_links_bulk")
+def create_links_bulk(api, options):
+    links = ({"name": f"Bulk {n}", "url": f"https://example.com/bulk/{n}"} for n in range(options.requests))
+    results = api.links.create_links_bulk(links, max_workers=options.concurrency)
+    return sum(1 for result in results if result.ok)
+
+
+@scenario("async_create_links_bulk", async_client=True)
+async def async_create_links_bulk(api, options):
+    links = ({"name": f"Bulk {n}", "url": f"https://example.com/bulk/{n}"} for n in range(options.requests))
+    results = await api.links.create_links_bulk(links, max_workers=options.concurrency)
+    return sum(1 for result in results if result.ok)
+
+
+@scenario("delete_links_bulk")
+def delete_links_bulk(api, options):
+    return api.links.delete_links_bulk(range(1, options.links + 1), chunk_size=500, max_workers=4)["deleted"]
+
+
+@scenario("update_links_bulk")
+def update_links_bulk(api, options):
+    links = ({"id": id, "url": f"https://example.com/articles/{id}"} for id in range(1, options.links + 1))
+    return api.links.update_links_bulk(links, collection_id=1, chunk_size=200, max_workers=4)["updated"]
+
+
+@scenario("archive_download")
+def archive_download(api, options):
+    with tempfile.TemporaryDirectory() as directory:
+        for n in range(options.downloads):
+            api.archives.download_archive(n + 1, 2, os.path.join(directory, f"{n}.pdf"))
+    return options.downloads
+
+
+@scenario("async_archive_download", async_client=True)
+async def async_archive_download(api, options):
+    with tempfile.TemporaryDirectory() as directory:
+        semaphore = asyncio.Semaphore(options.concurrency)
+
+        async def download(n):
+            async with semaphore:
+                await api.archives.download_archive(n + 1, 2, os.path.join(directory, f"{n}.pdf"))
+
+        await asyncio.gather(*(download(n) for n in range(options.downloads)))
+    return options.downloads
+
+
+@scenario("export_to_file")
+def export_to_file(api, options):
+    with tempfile.TemporaryDirectory() as directory:
+        api.migration.export_to_file(os.path.join(directory, "export.json"))
+    return 1
+
+
+@scenario("export_parse")
+def export_parse(api, options):
+    return sum(1 for kind, _ in api.migration.iter_export_data() if kind == "link")
+
+
+@scenario("export_data")
+def export_data(api, options):
+    # Whole export decoded in memory, the baseline of export_parse
+    data = api.migration.export_data()
+    return sum(len(collection["links"]) for collection in data["collections"])
+
+
+def run_scenario(name: str, base_url: str, options: argparse.Namespace) -> Dict[str, Any]:
+    """Run one scenario in the current process and measure it"""
+    from linkwarden import Api, AsyncApi, Transport, AsyncTransport, LatencyStats
+
+    func, async_client = SCENARIOS[name]
+    stats = LatencyStats()
+    rss_before = _peak_rss()
+
+    started = time.perf_counter()
+    if async_client:
+        async def main():
+            transport = AsyncTransport(max_connections=options.concurrency, hooks=[stats])
+            async with AsyncApi("benchmark", base_url=base_url, transport=transport) as api:
+                return await func(api, options)
+        operations = asyncio.run(main())
+    else:
+        transport = Transport(pool_maxsize=max(options.concurrency, 10), hooks=[stats])
+        api = Api("benchmark", base_url=base_url, transport=transport)
+        try:
+            operations = func(api, options)
+        finally:
+            transport.close()
+    elapsed = time.perf_counter() - started
+
+    requests = stats.report()
+    total_requests = sum(endpoint["count"] for endpoint in requests.values())
+    slowest = next(iter(requests.values()), {})
+    return {
+        "scenario": name,
+        "operations": operations,
+        "seconds": elapsed,
+        "ops_per_second": operations / elapsed if elapsed else None,
+        "requests": total_requests,
+        "errors": sum(endpoint["errors"] for endpoint in requests.values()),
+        "p50": slowest.get("p50"),
+        "p95": slowest.get("p95"),
+        "p99": slowest.get("p99"),
+        "rss_start": rss_before,
+        "rss_peak": _peak_rss(),
+    }
+
+
+def _run_in_child(name: str, base_url: str, options: argparse.Namespace, results: "multiprocessing.Queue"):
+    try:
+        results.put(run_scenario(name, base_url, options))
+    except Exception as e:
+        results.put({"scenario": name, "error": f"{type(e).__name__}: {e}"})
+
+
+def run_isolated(name: str, base_url: str, options: argparse.Namespace) -> Dict[str, Any]:
+    """Run one scenario in a new process, for a meaningful peak RSS. A crash of the child is reported as an error row"""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_run_in_child, args=(name, base_url, options, results))
+    process.start()
+
+    while True:
+        try:
+            result = results.get(timeout=1)
+            break
+        except queue.Empty:
+            if process.is_alive():
+                continue
+        # The child exited, its result may have been queued just before
+        try:
+            result = results.get(timeout=1)
+        except queue.Empty:
+            result = {"scenario": name, "error": f"process exited with code {process.exitcode} without a result"}
+        break
+
+    process.join()
+    return result
+
+
+def _peak_rss() -> Optional[float]:
+    """Peak resident memory of the process in MB, None if unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def format_results(results: List[Dict[str, Any]], baseline: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+    """Results as a text table, with the throughput change against the baseline when given"""
+    header = f"{'scenario':<26} {'ops':>8} {'ops/s':>10} {'reqs':>6} {'err':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'RSS MB':>8} {'+RSS MB':>8}"
+    if baseline:
+        header += f" {'vs base':>8}"
+    lines = [header]
+
+    for result in results:
+        if "error" in result:
+            lines.append(f"{result['scenario']:<26} failed: {result['error']}")
+            continue
+
+        line = (
+            f"{result['scenario']:<26} {result['operations']:>8} {result['ops_per_second']:>10.1f} {result['requests']:>6} "
+            f"{result['errors']:>4} {_ms(result['p50']):>8} {_ms(result['p95']):>8} {_ms(result['p99']):>8} "
+            f"{_mb(result['rss_peak']):>8} {_mb(_difference(result['rss_peak'], result['rss_start'])):>8}"
+        )
+        previous = (baseline or {}).get(result["scenario"])
+        if previous and previous.get("ops_per_second"):
+            change = (result["ops_per_second"] / previous["ops_per_second"] - 1) * 100
+            line += f" {change:>+7.1f}%"
+        lines.append(line)
+
+    return "\n".join(lines)
+
+
+def _difference(a: Optional[float], b: Optional[float]) -> Optional[float]:
+    return None if a is None or b is None else a - b
+
+
+def _ms(seconds: Optional[float]) -> str:
+    return "-" if seconds is None else f"{seconds * 1000:.1f}"
+
+
+def _mb(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmarks of the Linkwarden client against a local mock server")
+    parser.add_argument("scenarios", nargs="*", help=f"Scenarios to run, all by default: {', '.join(SCENARIOS)}")
+    parser.add_argument("--links", type=int, default=10000, help="Number of links served by the mock server")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--text-size", type=int, default=200, help="Size of the description of each link, in bytes")
+    parser.add_argument("--archive-size", type=int, default=1024 * 1024, help="Size of the archive files, in bytes")
+    parser.add_argument("--latency", type=float, default=0, help="Delay added to each response, in milliseconds")
+    parser.add_argument("--jitter", type=float, default=0, help="Random extra delay, in milliseconds")
+    parser.add_argument("--requests", type=int, default=500, help="Number of requests of the single request scenarios")
+    parser.add_argument("--downloads", type=int, default=20, help="Number of archives downloaded")
+    parser.add_argument("--concurrency", type=int, default=16, help="Threads, connections or tasks of the concurrent scenarios")
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file of a previous run to compare the throughput with")
+    options = parser.parse_args(argv)
+
+    names = options.scenarios or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(unknown)}")
+
+    baseline = None
+    if options.baseline:
+        with open(options.baseline) as f:
+            baseline = {result["scenario"]: result for result in json.load(f)["results"]}
+
+    config = MockConfig(links=options.links, page_size=options.page_size, text_size=options.text_size,
+                        archive_size=options.archive_size, latency=options.latency, jitter=options.jitter)
+    results = []
+    with MockServer(config) as server:
+        for name in names:
+            result = run_isolated(name, server.base_url, options)
+            results.append(result)
+            print(format_results([result]).splitlines()[1], flush=True)
+
+    print()
+    print(format_results(results, baseline))
+
+    if options.json:
+        with open(options.json, "w") as f:
+            json.dump({"options": {key: value for key, value in vars(options).items() if key not in ("json", "baseline")}, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,21 +3,114 @@
 Linkwarden API Python Wrapper
 """
 
-from .base import Base
-from .users import Users
-from .tags import Tags
-from .collections import Collections
-from .avatar import Avatar
-from .migration import Migration
-from .links import Links
-from .search import Search
-from .dashboard import Dashboard
-from .public import Public
-from .tokens import Tokens
-from .archives import Archives
-from .session import Session
-from .auth import Auth
-from .logins import Logins
+import importlib
+import threading
+from typing import TYPE_CHECKING, Optional
+
+# The submodules are only imported when one of their names is used (PEP 562), so
+# "import linkwarden" doesn't pay for requests, httpx, sqlite3, pyarrow... until they're needed
+_LAZY_IMPORTS = {
+    "Base": ".base",
+    "Transport": ".transport",
+    "ResponseCache": ".cache",
+    "SQLiteBackend": ".cache",
+    "RetryPolicy": ".retry",
+    "RateLimiter": ".ratelimit",
+    "Users": ".users",
+    "Tags": ".tags",
+    "Collections": ".collections",
+    "Avatar": ".avatar",
+    "Migration": ".migration",
+    "Links": ".links",
+    "Search": ".search",
+    "Dashboard": ".dashboard",
+    "Public": ".public",
+    "Tokens": ".tokens",
+    "Archives": ".archives",
+    "Session": ".session",
+    "Auth": ".auth",
+    "Logins": ".logins",
+    "AsyncApi": ".async_api",
+    "AsyncTransport": ".async_api",
+    "ArchiveExporter": ".exporter",
+    "LocalIndex": ".index",
+    "SyncEngine": ".sync",
+    "iter_export": ".jsonstream",
+    "MigrationImporter": ".importer",
+    "Link": ".models",
+    "Collection": ".models",
+    "Tag": ".models",
+    "User": ".models",
+    "Interner": ".models",
+    "LinkBatch": ".columnar",
+    "JSONDecoder": ".decoding",
+    "RequestEvent": ".instrumentation",
+    "RequestHook": ".instrumentation",
+    "LatencyStats": ".instrumentation",
+}
+
+# Resources of Api, created on first access: attribute -> (module, class)
+_RESOURCES = {
+    "users": (".users", "Users"),
+    "tags": (".tags", "Tags"),
+    "collections": (".collections", "Collections"),
+    "avatar": (".avatar", "Avatar"),
+    "migration": (".migration", "Migration"),
+    "links": (".links", "Links"),
+    "search": (".search", "Search"),
+    "dashboard": (".dashboard", "Dashboard"),
+    "public": (".public", "Public"),
+    "tokens": (".tokens", "Tokens"),
+    "archives": (".archives", "Archives"),
+    "session": (".session", "Session"),
+    "auth": (".auth", "Auth"),
+    "logins": (".logins", "Logins"),
+}
+
+if TYPE_CHECKING:
+    from .base import Base
+    from .transport import Transport
+    from .cache import ResponseCache, SQLiteBackend
+    from .retry import RetryPolicy
+    from .ratelimit import RateLimiter
+    from .users import Users
+    from .tags import Tags
+    from .collections import Collections
+    from .avatar import Avatar
+    from .migration import Migration
+    from .links import Links
+    from .search import Search
+    from .dashboard import Dashboard
+    from .public import Public
+    from .tokens import Tokens
+    from .archives import Archives
+    from .session import Session
+    from .auth import Auth
+    from .logins import Logins
+    from .async_api import AsyncApi, AsyncTransport
+    from .exporter import ArchiveExporter
+    from .index import LocalIndex
+    from .sync import SyncEngine
+    from .jsonstream import iter_export
+    from .importer import MigrationImporter
+    from .models import Link, Collection, Tag, User, Interner
+    from .columnar import LinkBatch
+    from .decoding import JSONDecoder
+    from .instrumentation import RequestEvent, RequestHook, LatencyStats
+
+
+def __getattr__(name: str):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
 
 class Api:
     """
@@ -41,34 +134,71 @@ class Api:
         auth: Authentication (password reset, email verification)
         session: Session management
         logins: Login configuration
+        transport: Pooled HTTP transport shared by all the resources
+
+    A default Transport is created if none is given. Pass your own to tune the
+    connection pool and the timeouts, e.g. Api(api_key, transport=Transport(pool_maxsize=32, timeout=(5, 60)))
+
+    The resources (and the default transport) are created on first access, so building an Api
+    is cheap and only the resources actually used are ever imported and constructed.
+    The creation is locked, so threads touching the same Api for the first time share one transport.
     """
-    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1"):
-        self.users = Users(api_key, base_url, api_version)
-        self.tags = Tags(api_key, base_url, api_version)
-        self.collections = Collections(api_key, base_url, api_version)
-        self.avatar = Avatar(api_key, base_url, api_version)
-        self.migration = Migration(api_key, base_url, api_version)
-        self.links = Links(api_key, base_url, api_version)
-        self.search = Search(api_key, base_url, api_version)
-        self.dashboard = Dashboard(api_key, base_url, api_version)
-        self.public = Public(api_key, base_url, api_version)
-        self.tokens = Tokens(api_key, base_url, api_version)
-        self.archives = Archives(api_key, base_url, api_version)
-        self.session = Session(api_key, base_url, api_version)
-        self.auth = Auth(api_key, base_url, api_version)
-        self.logins = Logins(api_key, base_url, api_version)
+    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1", transport: Optional["Transport"]=None):
+        self._settings = (api_key, base_url, api_version)
+        self._lock = threading.RLock()
+        if transport is not None:
+            self.transport = transport
+
+    def __getattr__(self, name: str):
+        # Only called for the attributes not created yet
+        if name != "transport" and name not in _RESOURCES:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+        with self._lock:
+            # Another thread may have created it while this one was waiting
+            if name in self.__dict__:
+                return self.__dict__[name]
+
+            if name == "transport":
+                from .transport import Transport
+                self.transport = Transport()
+                return self.transport
+
+            module, cls = _RESOURCES[name]
+            value = getattr(importlib.import_module(module, __name__), cls)(*self._settings, self.transport)
+            setattr(self, name, value)
+            return value
+
+    def close(self):
+        """Close the pooled connections of the shared transport, if it was created"""
+        transport = self.__dict__.get("transport")
+        if transport is not None:
+            transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
 
     def __dir__(self):
         return [
             'users', 'links', 'collections', 'tags', 'archives',
             'search', 'avatar', 'migration', 'dashboard', 'public',
-            'tokens', 'auth', 'session', 'logins'
+            'tokens', 'auth', 'session', 'logins', 'transport'
         ]
 
 
 __all__ = [
     "Api",
-    "Base", 
+    "AsyncApi",
+    "AsyncTransport",
+    "Base",
+    "Transport",
+    "ResponseCache",
+    "SQLiteBackend",
+    "RetryPolicy",
+    "RateLimiter",
     "Users",
     "Tags",
     "Collections",
@@ -82,5 +212,20 @@ __all__ = [
     "Archives",
     "Session",
     "Auth",
-    "Logins"
+    "Logins",
+    "ArchiveExporter",
+    "LocalIndex",
+    "SyncEngine",
+    "iter_export",
+    "MigrationImporter",
+    "Link",
+    "Collection",
+    "Tag",
+    "User",
+    "Interner",
+    "LinkBatch",
+    "JSONDecoder",
+    "RequestEvent",
+    "RequestHook",
+    "LatencyStats"
 ]
\ No newline at end of file
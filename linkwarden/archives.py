@@ -1,15 +1,23 @@
 #! -- coding: utf-8 --
 
-from .base import Base
-from typing import Dict, Any, BinaryIO
+from .base import Base, APIError
+from .transport import Transport
+from .multipart import MultipartEncoder
+from .concurrency import bounded_map, BulkResult
+from typing import Dict, Any, BinaryIO, Callable, Iterable, List, Optional, Tuple, Union
+import hashlib
 import os
+import requests
+
+# Archive formats and the file extension of each one
+ARCHIVE_FORMATS = {0: "png", 1: "jpeg", 2: "pdf", 3: "json", 4: "html"}
 
 class Archives(Base):
     """
     Class for managing archives
     """
-    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1"):
-        super().__init__(api_key, base_url, api_version)
+    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1", transport: Optional[Transport]=None):
+        super().__init__(api_key, base_url, api_version, transport)
         self.archives_endpoint = "/archives"
 
 
@@ -38,18 +46,85 @@ class Archives(Base):
         return self._make_request("GET", f"{self.archives_endpoint}/{link_id}", params={"format": format})
     
 
+    def download_archive(self,
+                         link_id: int,
+                         format: int,
+                         destination: Union[str, BinaryIO],
+                         chunk_size: int = 1024 * 1024,
+                         checksum: Optional[str] = None,
+                         resume: bool = False,
+                         progress: Optional[Callable[[int, Optional[int]], None]] = None,
+                         if_none_match: Optional[str] = None
+                         ) -> Dict[str, Any]:
+        """
+        Download an archive file by link ID, streaming it to disk
+
+        Unlike get_archive_by_link_id the file is never fully loaded in memory:
+        it's written chunk by chunk to the destination.
+
+        Args:
+            link_id (int, required): The ID of the link to get the archive for
+            format (int, required): The format of the archive to get (0 = PNG, 1 = JPEG, 2 = PDF, 3 = JSON, 4 = HTML)
+            destination (str or BinaryIO, required): Path of the file to write, or a writable binary file object
+            chunk_size (int, optional): Size of the chunks read from the network
+            checksum (str, optional): Name of a hashlib algorithm (e.g. "sha256") to compute while downloading
+            resume (bool, optional): If destination is a path to a partially downloaded file, only request the missing bytes.
+                If the server doesn't support ranges the whole file is downloaded again
+            progress (Callable, optional): Called after each chunk with (bytes written so far, total size or None)
+            if_none_match (str, optional): ETag of the copy already on disk. If the archive didn't change
+                the server answers 304 and the destination is left untouched
+
+        Returns:
+            Dictionary with the number of bytes of the file ("size"), the hex digest ("checksum", None if not requested),
+            the "etag" and the "content_type" of the archive, and whether it was "not_modified"
+
+        Raises:
+            APIError: If the API request fails
+            ValueError: If the format or the checksum algorithm are invalid
+        """
+        if format not in [0, 1, 2, 3, 4]:
+            raise ValueError("Invalid format. Valid formats are: 0 = PNG, 1 = JPEG, 2 = PDF, 3 = JSON, 4 = HTML")
+
+        download = _ArchiveDownload(destination, checksum, resume, progress, if_none_match)
+
+        try:
+            response = self._stream_request("GET", f"{self.archives_endpoint}/{link_id}", params={"format": format}, headers=download.headers())
+        except APIError as e:
+            # The partial file already has all the bytes
+            if e.status_code == 416 and download.offset:
+                return download.result()
+            raise
+
+        with response:
+            download.start(response.status_code, response.headers)
+            try:
+                for chunk in response.iter_content(chunk_size):
+                    download.write(chunk)
+            except requests.exceptions.RequestException as e:
+                raise APIError(f"Network error: {e}")
+            finally:
+                download.close()
+
+        return download.result()
+
+
     def upload_file_to_archive(self, 
                                link_id: int,
                                file_path: str,
-                               format: int
+                               format: int,
+                               use_mmap: bool = False,
+                               progress: Optional[Callable[[int, Optional[int]], None]] = None
                                ) -> Dict[str, Any]:
         """
         Upload a file to an archive providing file path
+        The multipart body is streamed, so the file is never fully loaded in memory.
 
         Args:
             link_id: The ID of the link to upload the file to
             file_path: The path to the file to upload
             format: The format of the file to upload (0 = PNG, 1 = JPEG, 2 = PDF)
+            use_mmap: Whether to memory-map the file instead of reading it in chunks (optional)
+            progress: Called after each chunk with (bytes sent so far, total size of the body) (optional)
 
         Returns:
             Archive file
@@ -67,18 +142,10 @@ class Archives(Base):
         if not os.path.isfile(file_path):
             raise ValueError(f"Path is not a file: {file_path}")
 
-        with open(file_path, 'rb') as file_object:
-            files = {
-                'file': (
-                    os.path.basename(file_path),  
-                    file_object,                   
-                    'application/octet-stream'  
-                )
-            }
-            
-            params = {"format": format}
-            
-            return self._make_request("POST", f"{self.archives_endpoint}/{link_id}", files=files, params=params)
+        params = {"format": format}
+
+        with MultipartEncoder("file", os.path.basename(file_path), file_path, use_mmap=use_mmap, progress=progress) as encoder:
+            return self._make_request("POST", f"{self.archives_endpoint}/{link_id}", data=encoder, headers=encoder.headers, params=params)
         
     
     def upload_file_object_to_archive(self, 
@@ -86,15 +153,18 @@ class Archives(Base):
                                       file_object: BinaryIO,
                                       filename: str,
                                       format: int,
+                                      progress: Optional[Callable[[int, Optional[int]], None]] = None
                                       ) -> Dict[str, Any]:
         """
         Upload a file to an archive providing file object
+        The file object is read in chunks while the request is sent.
 
         Args:
             link_id: The ID of the link to upload the file to
             file_object: The file object to upload
             filename: The name of the file to upload
             format: The format of the file to upload (0 = PNG, 1 = JPEG, 2 = PDF)
+            progress: Called after each chunk with (bytes sent so far, total size of the body or None) (optional)
 
         Returns:
             Archive file
@@ -112,18 +182,141 @@ class Archives(Base):
         if 'b' not in getattr(file_object, 'mode', ''):
             raise ValueError("File must be opened in binary mode ('rb')")
         
-        files = {
-            'file': (
-                filename,
-                file_object,
-                'application/octet-stream'
-            )
-        }
+        encoder = MultipartEncoder("file", filename, file_object, progress=progress)
         
         params = {"format": format}
         
-        return self._make_request("POST", f"{self.archives_endpoint}/{link_id}", files=files, params=params)
+        return self._make_request("POST", f"{self.archives_endpoint}/{link_id}", data=encoder, headers=encoder.headers, params=params)
+
+
+    def upload_files_to_archive(self,
+                                files: Iterable[Tuple[int, str, int]],
+                                max_workers: int = 4,
+                                use_mmap: bool = False,
+                                progress: Optional[Callable[[int, int, Optional[int]], None]] = None
+                                ) -> List[BulkResult]:
+        """
+        Upload many files in parallel
+
+        Args:
+            files: Iterable of (link_id, file_path, format) tuples
+            max_workers: Maximum number of concurrent uploads
+            use_mmap: Whether to memory-map the files instead of reading them in chunks
+            progress: Called after each chunk with (link_id, bytes sent so far, total size of the body)
+
+        Returns:
+            List of BulkResult in input order, one per file, with the API response or the error.
+            A failed upload doesn't stop the others.
+        """
+        def upload(item):
+            link_id, file_path, format = item
+            file_progress = (lambda sent, total: progress(link_id, sent, total)) if progress else None
+            return self.upload_file_to_archive(link_id, file_path, format, use_mmap=use_mmap, progress=file_progress)
+
+        return list(bounded_map(upload, files, max_workers=max_workers))
 
     
     def update_archive_file(self):
-        pass
\ No newline at end of file
+        pass
+
+
+class _ArchiveDownload:
+    """
+    State of a streaming archive download (destination, resume offset, checksum, progress),
+    independent of the HTTP client reading the body
+    """
+    def __init__(self,
+                 destination: Union[str, BinaryIO],
+                 checksum: Optional[str],
+                 resume: bool,
+                 progress: Optional[Callable[[int, Optional[int]], None]],
+                 if_none_match: Optional[str] = None
+                 ):
+        if checksum and checksum not in hashlib.algorithms_available:
+            raise ValueError(f"Invalid checksum algorithm: {checksum}")
+
+        self.destination = destination
+        self.checksum = checksum
+        self.progress = progress
+        self.if_none_match = if_none_match
+        self.not_modified = False
+        self.digest = hashlib.new(checksum) if checksum else None
+        self.offset = 0
+        self.size = 0
+        self.total = None
+        self.etag = None
+        self.content_type = None
+        self.sink = None
+
+        is_path = isinstance(destination, (str, os.PathLike))
+        if resume and is_path and os.path.isfile(destination):
+            self.offset = os.path.getsize(destination)
+            self.size = self.offset
+            if self.digest:
+                with open(destination, "rb") as f:
+                    for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                        self.digest.update(chunk)
+
+
+    def headers(self) -> Dict[str, str]:
+        """Headers of the download request"""
+        # No compression, so that byte offsets match the file on disk
+        headers = {"Accept-Encoding": "identity"}
+        if self.offset:
+            headers["Range"] = f"bytes={self.offset}-"
+        if self.if_none_match:
+            headers["If-None-Match"] = self.if_none_match
+        return headers
+
+
+    def start(self, status_code: int, headers):
+        """Open the destination once the response headers are known"""
+        self.etag = headers.get("ETag")
+        self.content_type = headers.get("Content-Type")
+
+        if status_code == 304:
+            self.not_modified = True
+            return
+
+        if self.offset and status_code != 206:
+            # The server ignored the range, start over
+            self.offset = 0
+            self.size = 0
+            self.digest = hashlib.new(self.checksum) if self.checksum else None
+
+        length = headers.get("Content-Length")
+        self.total = int(length) + self.offset if length and length.isdigit() else None
+
+        if isinstance(self.destination, (str, os.PathLike)):
+            self.sink = open(self.destination, "ab" if self.offset else "wb")
+        else:
+            self.sink = self.destination
+
+
+    def write(self, chunk: bytes):
+        """Write a chunk to the destination"""
+        if self.sink is None:
+            return
+        self.sink.write(chunk)
+        self.size += len(chunk)
+        if self.digest:
+            self.digest.update(chunk)
+        if self.progress:
+            self.progress(self.size, self.total)
+
+
+    def close(self):
+        """Close the destination file if it was opened here"""
+        if self.sink is not None and self.sink is not self.destination:
+            self.sink.close()
+
+
+    def result(self) -> Dict[str, Any]:
+        """Summary of the download"""
+        return {
+            "size": self.size,
+            "checksum": self.digest.hexdigest() if self.digest else None,
+            "etag": self.etag,
+            "content_type": self.content_type,
+            "not_modified": self.not_modified
+        }
@@ -0,0 +1,746 @@
+#! -- coding: utf-8 --
+"""
+Asyncio client for the Linkwarden API
+
+Every Async* resource class reuses the methods of its synchronous counterpart:
+the only difference is that _make_request is a coroutine, so each method returns
+an awaitable instead of the result.
+
+    async with AsyncApi(api_key) as api:
+        link = await api.links.get_link(123)
+
+It requires httpx (pip install httpx).
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Any, AsyncIterator, Awaitable, BinaryIO, Callable, Iterable, List, Optional, Tuple, Union
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+from .base import Base, APIError
+from .users import Users
+from .tags import Tags
+from .collections import Collections
+from .avatar import Avatar
+from .migration import Migration
+from .links import Links, BISECTABLE_STATUSES
+from .search import Search
+from .dashboard import Dashboard
+from .public import Public
+from .tokens import Tokens
+from .archives import Archives, _ArchiveDownload
+from .session import Session
+from .auth import Auth
+from .logins import Logins
+from .pagination import aiter_items
+from .jsonstream import iter_export
+from .models import Link, Interner
+from .multipart import MultipartEncoder
+from .concurrency import BulkResult, abounded_map, chunked, first_occurrences
+from .retry import RetryPolicy
+from .ratelimit import RateLimiter
+from .decoding import JSONDecoder
+from .instrumentation import RequestEvent, RequestHook, body_size
+from .singleflight import AsyncSingleFlight, request_key
+
+
+class AsyncTransport:
+    """
+    Pooled asynchronous HTTP transport shared by all the async API classes
+
+    It wraps a single httpx.AsyncClient, so all the resources of an AsyncApi
+    share the same connection pool and can run many concurrent requests from one event loop.
+
+    Args:
+        max_connections: Maximum number of concurrent connections
+        max_keepalive_connections: Maximum number of idle connections kept alive
+        timeout: Default timeout for every request, either seconds or a (connect, read) tuple.
+            None means no timeout
+        retry: Optional RetryPolicy for transient failures (connection errors, timeouts, 429/5xx responses)
+        limiter: Optional RateLimiter capping the request rate and the requests in flight of all the resources
+        decoder: JSONDecoder of the responses, the fastest one installed by default
+        hooks: RequestHook objects called before and after every attempt, e.g. a LatencyStats
+        coalesce: Whether identical GET requests sent at the same time by several tasks share
+            a single request to the server (and its response)
+
+    Raises:
+        ImportError: If httpx is not installed
+    """
+    def __init__(self,
+                 max_connections: int = 100,
+                 max_keepalive_connections: int = 20,
+                 timeout: Optional[Union[float, Tuple[float, float]]] = None,
+                 retry: Optional[RetryPolicy] = None,
+                 limiter: Optional[RateLimiter] = None,
+                 decoder: Optional[JSONDecoder] = None,
+                 hooks: Optional[Iterable[RequestHook]] = None,
+                 coalesce: bool = True
+                 ):
+        if httpx is None:
+            raise ImportError("The async client requires httpx, install it with: pip install httpx")
+
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            timeout = httpx.Timeout(read, connect=connect)
+
+        self.timeout = timeout
+        self.retry = retry
+        self.limiter = limiter
+        self.decoder = decoder if decoder is not None else JSONDecoder()
+        self.hooks = list(hooks or [])
+        self.single_flight = AsyncSingleFlight() if coalesce else None
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections),
+            timeout=timeout
+        )
+
+
+    async def request(self, method: str, url: str, **kwargs) -> "httpx.Response":
+        """
+        Send a request through the pooled client
+
+        Args:
+            method: HTTP method
+            url: Full URL of the request
+            **kwargs: Any other argument accepted by httpx
+
+        Returns:
+            The httpx.Response object
+
+        Raises:
+            httpx.HTTPError: If the request fails
+        """
+        key = request_key(method, url, kwargs) if self.single_flight is not None else None
+        if key is not None:
+            return await self.single_flight.do(key, lambda: self._request(method, url, **kwargs))
+
+        return await self._request(method, url, **kwargs)
+
+
+    async def _request(self, method: str, url: str, **kwargs) -> "httpx.Response":
+        """Send a request, retrying it according to the retry policy"""
+        # Streaming bodies (e.g. MultipartEncoder) have to be sent as async iterators
+        if hasattr(kwargs.get("data"), "__aiter__"):
+            kwargs["content"] = kwargs.pop("data").__aiter__()
+
+        stream = kwargs.pop("stream", False)
+
+        if self.retry is None or "files" in kwargs or "content" in kwargs or not self.retry.allows(method, kwargs.get("data")):
+            return await self._send(method, url, stream, **kwargs)
+
+        started = time.monotonic()
+        attempt = 0
+
+        while True:
+            try:
+                response = await self._send(method, url, stream, attempt, **kwargs)
+            except httpx.TransportError:
+                delay = self.retry.delay(attempt)
+                if not self.retry.can_retry(attempt, started, delay):
+                    raise
+            else:
+                if not self.retry.retry_status(response.status_code):
+                    return response
+
+                delay = self.retry.delay(attempt, response.headers.get("Retry-After"))
+                if not self.retry.can_retry(attempt, started, delay):
+                    return response
+                await response.aclose()
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+    async def _send(self, method: str, url: str, stream: bool, attempt: int = 0, **kwargs) -> "httpx.Response":
+        """Send a single attempt, through the rate limiter if any"""
+        if self.limiter is None:
+            return await self._send_now(method, url, stream, attempt, **kwargs)
+
+        await self.limiter.acquire_async()
+        status_code = None
+        try:
+            response = await self._send_now(method, url, stream, attempt, **kwargs)
+            status_code = response.status_code
+            return response
+        finally:
+            self.limiter.release_async(status_code)
+
+
+    async def _send_now(self, method: str, url: str, stream: bool, attempt: int, **kwargs) -> "httpx.Response":
+        if not self.hooks:
+            if stream:
+                return await self.client.send(self.client.build_request(method, url, **kwargs), stream=True)
+            return await self.client.request(method, url, **kwargs)
+
+        event = RequestEvent(method, url, attempt, body_size(kwargs))
+        for hook in self.hooks:
+            hook.before_request(event)
+
+        connecting = {}
+
+        async def trace(name, info):
+            # httpcore reports the TCP connection and the TLS handshake of new connections
+            if name == "connection.connect_tcp.started":
+                connecting["started"] = time.perf_counter()
+            elif name in ("connection.connect_tcp.complete", "connection.start_tls.complete") and "started" in connecting:
+                event.connect = time.perf_counter() - connecting["started"]
+
+        started = time.perf_counter()
+        try:
+            request = self.client.build_request(method, url, extensions={"trace": trace}, **kwargs)
+            response = await self.client.send(request, stream=True)
+            event.status_code = response.status_code
+            event.ttfb = time.perf_counter() - started
+
+            if stream:
+                length = response.headers.get("Content-Length")
+                event.response_bytes = int(length) if length and length.isdigit() else None
+            else:
+                try:
+                    await response.aread()
+                finally:
+                    await response.aclose()
+                event.response_bytes = response.num_bytes_downloaded
+            return response
+        except Exception as e:
+            event.error = e
+            raise
+        finally:
+            event.total = time.perf_counter() - started
+            for hook in self.hooks:
+                hook.after_request(event)
+
+
+    async def close(self):
+        """Close all the pooled connections"""
+        await self.client.aclose()
+
+
+    async def __aenter__(self):
+        return self
+
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+
+class AsyncBase(Base):
+    """Base class for all async API classes"""
+    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1", transport: Optional[AsyncTransport]=None):
+        super().__init__(api_key, base_url, api_version, transport if transport is not None else AsyncTransport())
+
+
+    async def _make_request(self, method: str, endpoint: str, headers: Optional[Dict[str, str]] = None, **kwargs) -> Dict[str, Any]:
+        """Generic coroutine to make HTTP requests with error handling, extra headers are merged over the default ones"""
+        url = self._build_url(endpoint)
+
+        try:
+            response = await self.transport.request(method, url, headers={**self.headers, **(headers or {})}, **kwargs)
+            response.raise_for_status()
+            return self._parse_response(response)
+
+        except httpx.HTTPError as e:
+            if isinstance(e, httpx.HTTPStatusError):
+                raise APIError(f"API request failed: {e}", e.response.status_code)
+            raise APIError(f"Network error: {e}")
+
+
+    async def _then(self, result: Any, func) -> Any:
+        """Async version of Base._then: await the result of _make_request, then apply func"""
+        return func(await result)
+
+
+    async def _get_by_ids(self, get: Callable[[Any], Awaitable[Any]], ids: Iterable[Any], max_workers: int) -> List[BulkResult]:
+        """Async version of Base._get_by_ids, AsyncTransport has no response cache so every distinct ID is requested"""
+        ids = list(ids)
+        outcomes = {outcome.item: outcome for outcome in await abounded_map(get, dict.fromkeys(ids), max_workers)}
+        return [BulkResult(index, id, outcomes[id].result, outcomes[id].error) for index, id in enumerate(ids)]
+
+
+    async def _iter_by_ids(self, get: Callable[[Any], Awaitable[Any]], ids: Iterable[Any], max_workers: int, ordered: bool) -> AsyncIterator[BulkResult]:
+        """Async version of Base._iter_by_ids, with at most max_workers requests in flight"""
+        async def call(index, id):
+            try:
+                return BulkResult(index, id, result=await get(id))
+            except Exception as e:
+                return BulkResult(index, id, error=e)
+
+        entries = first_occurrences(ids)
+        pending = []
+        exhausted = False
+
+        try:
+            while True:
+                while not exhausted and len(pending) < max(1, max_workers):
+                    entry = next(entries, None)
+                    if entry is None:
+                        exhausted = True
+                        break
+                    pending.append(asyncio.ensure_future(call(*entry)))
+
+                if not pending:
+                    return
+
+                if ordered:
+                    yield await pending.pop(0)
+                else:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        pending.remove(task)
+                        yield task.result()
+        finally:
+            # The consumer stopped early
+            for task in pending:
+                task.cancel()
+
+
+    async def _stream_request(self, method: str, endpoint: str, headers: Optional[Dict[str, str]] = None, **kwargs) -> "httpx.Response":
+        """
+        Async version of Base._stream_request
+
+        The returned response must be closed by the caller with "await response.aclose()"
+        and its body consumed with response.aiter_bytes().
+        """
+        url = self._build_url(endpoint)
+
+        try:
+            response = await self.transport.request(method, url, headers={**self.headers, **(headers or {})}, stream=True, **kwargs)
+        except httpx.HTTPError as e:
+            raise APIError(f"Network error: {e}")
+
+        if response.is_error:
+            await response.aclose()
+            raise APIError(f"API request failed: {response.status_code} {response.reason_phrase} for url: {url}", response.status_code)
+
+        return response
+
+
+async def _send_bisecting(send, chunk: list):
+    """Async version of links._send_bisecting, the halves are sent one after the other to stay within max_workers"""
+    try:
+        await send(chunk)
+        return len(chunk), []
+    except APIError as e:
+        if len(chunk) == 1 or e.status_code not in BISECTABLE_STATUSES:
+            return 0, [(item, e) for item in chunk]
+
+    middle = len(chunk) // 2
+    left = await _send_bisecting(send, chunk[:middle])
+    right = await _send_bisecting(send, chunk[middle:])
+    return left[0] + right[0], left[1] + right[1]
+
+
+class AsyncUsers(AsyncBase, Users):
+    """Async version of Users"""
+
+
+class AsyncTags(AsyncBase, Tags):
+    """Async version of Tags"""
+
+
+class AsyncCollections(AsyncBase, Collections):
+    """Async version of Collections"""
+
+
+class AsyncAvatar(AsyncBase, Avatar):
+    """Async version of Avatar"""
+
+
+class AsyncMigration(AsyncBase, Migration):
+    """Async version of Migration"""
+
+    async def export_to_file(self,
+                             destination: Union[str, os.PathLike, BinaryIO],
+                             chunk_size: int = 1024 * 1024,
+                             progress: Optional[Callable[[int, Optional[int]], None]] = None
+                             ) -> Dict[str, Any]:
+        """
+        Async version of Migration.export_to_file, see it for the arguments
+
+        Returns:
+            Dictionary with the number of bytes written ("size") and the "content_type"
+
+        Raises:
+            APIError: If the API request fails
+        """
+        if isinstance(destination, os.PathLike):
+            destination = os.fspath(destination)
+        target = destination + ".part" if isinstance(destination, str) else destination
+        download = _ArchiveDownload(target, None, False, progress, None)
+
+        response = await self._stream_request("GET", self.migration_endpoint)
+        try:
+            download.start(response.status_code, response.headers)
+            try:
+                async for chunk in response.aiter_bytes(chunk_size):
+                    download.write(chunk)
+            except httpx.HTTPError as e:
+                raise APIError(f"Network error: {e}")
+            finally:
+                download.close()
+        finally:
+            await response.aclose()
+
+        if isinstance(destination, str):
+            os.replace(target, destination)
+
+        result = download.result()
+        return {"size": result["size"], "content_type": result["content_type"]}
+
+
+    async def iter_export_data(self, chunk_size: int = 64 * 1024) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Async version of Migration.iter_export_data
+
+        The export is downloaded to a temporary file first, so the event loop is never
+        blocked by the network, then parsed from it item by item.
+        """
+        with tempfile.TemporaryFile() as f:
+            await self.export_to_file(f)
+            f.seek(0)
+            for item in iter_export(f, chunk_size):
+                yield item
+
+
+class AsyncLinks(AsyncBase, Links):
+    """Async version of Links"""
+
+    async def create_links_bulk(self,
+                                links: Iterable[Dict[str, Any]],
+                                max_workers: int = 8,
+                                dedupe: bool = False,
+                                existing_urls: Optional[Iterable[str]] = None
+                                ) -> List[BulkResult]:
+        """
+        Async version of Links.create_links_bulk, see it for the arguments
+
+        Returns:
+            List of BulkResult in input order
+        """
+        seen = None
+        if dedupe:
+            seen = set(existing_urls) if existing_urls is not None else {link.get("url") async for link in self._iter_all_links()}
+
+        def mark_duplicates():
+            for link in links:
+                url = link.get("url")
+                duplicate = seen is not None and url is not None and url in seen
+                if seen is not None and url is not None:
+                    seen.add(url)
+                yield link, duplicate
+
+        async def create(entry):
+            link, duplicate = entry
+            if duplicate:
+                return None
+            return await self.create_link(**link)
+
+        return [
+            BulkResult(outcome.index, outcome.item[0], outcome.result, outcome.error, skipped=outcome.item[1])
+            for outcome in await abounded_map(create, mark_duplicates(), max_workers)
+        ]
+
+
+    async def delete_links_bulk(self, ids: Iterable[int], chunk_size: int = 500, max_workers: int = 4) -> Dict[str, Any]:
+        """
+        Async version of Links.delete_links_bulk, see it for the arguments
+
+        Returns:
+            Dictionary with the number of "deleted" IDs and the "failed" ones, mapped to their error
+        """
+        deleted, failed = await self._run_chunks(self.delete_link_list, ids, chunk_size, max_workers)
+        return {"deleted": deleted, "failed": {id: error for id, error in failed}}
+
+
+    async def update_links_bulk(self,
+                                links: Iterable[Dict[str, Any]],
+                                collection_id: int,
+                                remove_previous_tags: bool = False,
+                                new_tags: list[Dict[str, Any]] = None,
+                                chunk_size: int = 200,
+                                max_workers: int = 4
+                                ) -> Dict[str, Any]:
+        """
+        Async version of Links.update_links_bulk, see it for the arguments
+
+        Returns:
+            Dictionary with the number of "updated" links and the "failed" ones, as link ID mapped to the error
+        """
+        def update(chunk):
+            return self.bulk_update_links(chunk, collection_id, remove_previous_tags, new_tags)
+
+        updated, failed = await self._run_chunks(update, links, chunk_size, max_workers)
+        return {"updated": updated, "failed": {link.get("id"): error for link, error in failed}}
+
+
+    async def _run_chunks(self, send, items, chunk_size, max_workers):
+        succeeded = 0
+        failed = []
+        for outcome in await abounded_map(lambda chunk: _send_bisecting(send, chunk), chunked(items, chunk_size), max_workers):
+            if not outcome.ok:
+                raise outcome.error
+            succeeded += outcome.result[0]
+            failed.extend(outcome.result[1])
+        return succeeded, failed
+
+
+    def _iter_all_links(self) -> AsyncIterator[Dict[str, Any]]:
+        return aiter_items(lambda cursor: self._make_request("GET", "/search", params={"searchQueryString": "", "cursor": cursor or 0}), prefetch=True)
+
+
+class AsyncSearch(AsyncBase, Search):
+    """Async version of Search"""
+
+    def iter_links(self, query: str, prefetch: bool = False, as_model: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async version of Search.iter_links, use it with "async for"
+
+        Args:
+            query: The query to search for
+            prefetch: Whether to fetch the next page while the current one is consumed
+            as_model: Yield Link models, sharing their collections and tags across all the pages
+
+        Yields:
+            Link dictionaries
+        """
+        links = aiter_items(lambda cursor: self.search_links(query, cursor or 0), prefetch=prefetch)
+        return self._as_models(links) if as_model else links
+
+
+    @staticmethod
+    async def _as_models(links: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[Link]:
+        interner = Interner()
+        async for link in links:
+            yield Link(link, interner)
+
+
+class AsyncDashboard(AsyncBase, Dashboard):
+    """Async version of Dashboard"""
+
+
+class AsyncPublic(AsyncBase, Public):
+    """Async version of Public"""
+
+    def iter_links_from_collection(self, collection_id: int, read_ahead: int = 2, **filters) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async version of Public.iter_links_from_collection, use it with "async for"
+
+        Each page depends on the cursor of the previous one, so only the next page is prefetched
+        (when read_ahead > 0) while the current one is consumed.
+
+        Args:
+            collection_id: The ID of the collection to get links from (required)
+            read_ahead: 0 to fetch each page on demand, anything else to prefetch the next page
+            **filters: Any other parameter of get_links_from_collection
+
+        Yields:
+            Link dictionaries
+        """
+        return aiter_items(lambda cursor: self.get_links_from_collection(collection_id, cursor=cursor, **filters), prefetch=read_ahead > 0)
+
+
+class AsyncTokens(AsyncBase, Tokens):
+    """Async version of Tokens"""
+
+
+class AsyncArchives(AsyncBase, Archives):
+    """Async version of Archives"""
+
+    async def upload_file_to_archive(self,
+                                     link_id: int,
+                                     file_path: str,
+                                     format: int,
+                                     use_mmap: bool = False,
+                                     progress: Optional[Callable[[int, Optional[int]], None]] = None
+                                     ) -> Dict[str, Any]:
+        """
+        Upload a file to an archive providing file path
+
+        The file has to stay open until the request is sent, so unlike the other
+        methods this one can't just return the coroutine of the sync version.
+
+        Args:
+            link_id: The ID of the link to upload the file to
+            file_path: The path to the file to upload
+            format: The format of the file to upload (0 = PNG, 1 = JPEG, 2 = PDF)
+            use_mmap: Whether to memory-map the file instead of reading it in chunks (optional)
+            progress: Called after each chunk with (bytes sent so far, total size of the body) (optional)
+
+        Returns:
+            Archive file
+
+        Raises:
+            APIError: If the API request fails
+            ValueError: If the format is invalid
+        """
+        if format not in [0, 1, 2]:
+            raise ValueError("Invalid format. Valid formats are: 0 = PNG, 1 = JPEG, 2 = PDF")
+
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        if not os.path.isfile(file_path):
+            raise ValueError(f"Path is not a file: {file_path}")
+
+        with MultipartEncoder("file", os.path.basename(file_path), file_path, use_mmap=use_mmap, progress=progress) as encoder:
+            return await self._make_request("POST", f"{self.archives_endpoint}/{link_id}", data=encoder, headers=encoder.headers, params={"format": format})
+
+
+    async def upload_files_to_archive(self,
+                                      files: Iterable[Tuple[int, str, int]],
+                                      max_workers: int = 4,
+                                      use_mmap: bool = False,
+                                      progress: Optional[Callable[[int, int, Optional[int]], None]] = None
+                                      ) -> List[BulkResult]:
+        """
+        Async version of Archives.upload_files_to_archive, at most max_workers uploads run at the same time
+
+        Returns:
+            List of BulkResult in input order, one per file
+        """
+        async def upload(item):
+            link_id, file_path, format = item
+            file_progress = (lambda sent, total: progress(link_id, sent, total)) if progress else None
+            return await self.upload_file_to_archive(link_id, file_path, format, use_mmap, file_progress)
+
+        return await abounded_map(upload, files, max_workers)
+
+
+    async def download_archive(self,
+                               link_id: int,
+                               format: int,
+                               destination: Union[str, BinaryIO],
+                               chunk_size: int = 1024 * 1024,
+                               checksum: Optional[str] = None,
+                               resume: bool = False,
+                               progress: Optional[Callable[[int, Optional[int]], None]] = None,
+                               if_none_match: Optional[str] = None
+                               ) -> Dict[str, Any]:
+        """
+        Async version of Archives.download_archive, see it for the arguments
+
+        Returns:
+            Dictionary with "size", "checksum", "etag", "content_type" and "not_modified"
+
+        Raises:
+            APIError: If the API request fails
+            ValueError: If the format or the checksum algorithm are invalid
+        """
+        if format not in [0, 1, 2, 3, 4]:
+            raise ValueError("Invalid format. Valid formats are: 0 = PNG, 1 = JPEG, 2 = PDF, 3 = JSON, 4 = HTML")
+
+        download = _ArchiveDownload(destination, checksum, resume, progress, if_none_match)
+
+        try:
+            response = await self._stream_request("GET", f"{self.archives_endpoint}/{link_id}", params={"format": format}, headers=download.headers())
+        except APIError as e:
+            if e.status_code == 416 and download.offset:
+                return download.result()
+            raise
+
+        try:
+            download.start(response.status_code, response.headers)
+            try:
+                async for chunk in response.aiter_bytes(chunk_size):
+                    download.write(chunk)
+            except httpx.HTTPError as e:
+                raise APIError(f"Network error: {e}")
+            finally:
+                download.close()
+        finally:
+            await response.aclose()
+
+        return download.result()
+
+
+class AsyncSession(AsyncBase, Session):
+    """Async version of Session"""
+
+
+class AsyncAuth(AsyncBase, Auth):
+    """Async version of Auth"""
+
+
+class AsyncLogins(AsyncBase, Logins):
+    """Async version of Logins"""
+
+
+_ASYNC_RESOURCES = {
+    "users": AsyncUsers,
+    "tags": AsyncTags,
+    "collections": AsyncCollections,
+    "avatar": AsyncAvatar,
+    "migration": AsyncMigration,
+    "links": AsyncLinks,
+    "search": AsyncSearch,
+    "dashboard": AsyncDashboard,
+    "public": AsyncPublic,
+    "tokens": AsyncTokens,
+    "archives": AsyncArchives,
+    "session": AsyncSession,
+    "auth": AsyncAuth,
+    "logins": AsyncLogins,
+}
+
+
+class AsyncApi:
+    """
+    Asyncio client for Linkwarden
+
+    Same resources as Api, but every method returns an awaitable.
+    All the resources share a single AsyncTransport, so hundreds of concurrent
+    requests can run from one event loop on the same connection pool.
+
+    Attributes:
+        users, links, collections, tags, archives, search, avatar, migration,
+        dashboard, public, tokens, auth, session, logins: see Api
+        transport: Pooled async HTTP transport shared by all the resources
+    """
+    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1", transport: Optional[AsyncTransport]=None):
+        self._settings = (api_key, base_url, api_version)
+        self._lock = threading.RLock()
+        if transport is not None:
+            self.transport = transport
+
+    def __getattr__(self, name: str):
+        # Resources and the default transport are created on first access, like in Api, under the same lock
+        if name != "transport" and name not in _ASYNC_RESOURCES:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+        with self._lock:
+            if name in self.__dict__:
+                return self.__dict__[name]
+
+            if name == "transport":
+                self.transport = AsyncTransport()
+                return self.transport
+
+            value = _ASYNC_RESOURCES[name](*self._settings, self.transport)
+            setattr(self, name, value)
+            return value
+
+    async def close(self):
+        """Close the pooled connections of the shared transport, if it was created"""
+        transport = self.__dict__.get("transport")
+        if transport is not None:
+            await transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    def __dir__(self):
+        return [
+            'users', 'links', 'collections', 'tags', 'archives',
+            'search', 'avatar', 'migration', 'dashboard', 'public',
+            'tokens', 'auth', 'session', 'logins', 'transport'
+        ]
@@ -1,14 +1,15 @@
 #! -- coding: utf-8 --
 
 from .base import Base
-from typing import Dict, Any
+from .transport import Transport
+from typing import Dict, Any, Optional
 
 class Auth(Base):
     """
     Class for managing authentication
     """
-    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1"):
-        super().__init__(api_key, base_url, api_version)
+    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1", transport: Optional[Transport]=None):
+        super().__init__(api_key, base_url, api_version, transport)
         self.auth_endpoint = "/auth"
     
     
@@ -1,7 +1,13 @@
 #! -- coding: utf-8 --
 
 import requests
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional
+from .transport import Transport
+from .cache import ResponseCache
+from .decoding import JSONDecoder
+from .concurrency import BulkResult, bounded_map, first_occurrences
+
+DEFAULT_DECODER = JSONDecoder()
 
 class APIError(Exception):
     """Custom exception for API errors"""
@@ -12,8 +18,15 @@ class APIError(Exception):
 
 
 class Base:
-    """Base class for all API classes"""
-    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1"):
+    """
+    Base class for all API classes
+
+    All the requests go through self.transport, which can be shared between
+    several API classes to reuse the same pooled connections.
+    If no transport is given, a new one is created.
+    """
+    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1", transport: Optional[Transport]=None):
+        self.transport = transport if transport is not None else Transport()
         self.api_key = api_key
         self.api_version = api_version
         self.base_url = base_url + "/api/" + api_version
@@ -22,32 +35,149 @@ class Base:
             "Content-Type": "application/json"
         }
 
-    def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
-        """Generic method to make HTTP requests with error handling"""
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        
-        try:
-            response = requests.request(method, url, headers=self.headers, **kwargs)
-            response.raise_for_status()
-            content_type = response.headers.get('Content-Type', '')
+    def _make_request(self, method: str, endpoint: str, headers: Optional[Dict[str, str]] = None, **kwargs) -> Dict[str, Any]:
+        """Generic method to make HTTP requests with error handling, extra headers are merged over the default ones"""
+        url = self._build_url(endpoint)
+        headers = {**self.headers, **(headers or {})}
+        cache = self.transport.cache
+
+        if cache is not None and method.upper() == "GET":
+            return self._make_cached_request(cache, endpoint, url, headers, **kwargs)
+
+        response = self._send(method, url, headers, **kwargs)
+
+        if cache is not None:
+            cache.invalidate(endpoint)
+
+        return self._parse_response(response)
+
+
+    def _make_cached_request(self, cache: ResponseCache, endpoint: str, url: str, headers: Dict[str, str], **kwargs) -> Any:
+        """GET request going through the response cache of the transport"""
+        key = cache.key(self.api_key, url, kwargs.get("params"))
+        entry = cache.get(key)
+
+        if entry is not None and entry.fresh:
+            return cache.copy_value(entry.value)
+
+        if entry is not None and entry.revalidatable:
+            headers = {**headers, **cache.conditional_headers(entry)}
 
-            if 'application/json' in content_type:
-                result = response.json()
+        response = self._send("GET", url, headers, **kwargs)
 
-                if isinstance(result, dict) and "response" in result:
-                    return result["response"]
+        if response.status_code == 304 and entry is not None:
+            cache.refresh(key, endpoint, entry, response.headers)
+            return cache.copy_value(entry.value)
 
-                return result
+        result = self._parse_response(response)
+        if cache.store(key, endpoint, result, response.headers) is None:
+            return result
+        return cache.copy_value(result)
 
-            elif 'text/' in content_type:
-                return response.text
-                
-            else:
-                return response.content
+
+    def _send(self, method: str, url: str, headers: Dict[str, str], **kwargs) -> requests.Response:
+        """Send a request through the transport, turning any failure into an APIError"""
+        try:
+            response = self.transport.request(method, url, headers=headers, **kwargs)
+            response.raise_for_status()
+            return response
             
         except requests.exceptions.RequestException as e:
             if hasattr(e, 'response') and e.response is not None:
                 raise APIError(f"API request failed: {e}", e.response.status_code)
             raise APIError(f"Network error: {e}")
 
-        
+
+    def _stream_request(self, method: str, endpoint: str, headers: Optional[Dict[str, str]] = None, **kwargs) -> requests.Response:
+        """
+        Make an HTTP request without reading the body
+
+        The returned response must be closed by the caller, ideally using it as a context manager,
+        and its body consumed with response.iter_content().
+
+        Args:
+            method: HTTP method
+            endpoint: The endpoint to call
+            headers: Extra headers merged over the default ones
+            **kwargs: Any other argument accepted by requests
+
+        Raises:
+            APIError: If the API request fails
+        """
+        url = self._build_url(endpoint)
+
+        try:
+            response = self.transport.request(method, url, headers={**self.headers, **(headers or {})}, stream=True, **kwargs)
+        except requests.exceptions.RequestException as e:
+            raise APIError(f"Network error: {e}")
+
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            response.close()
+            raise APIError(f"API request failed: {e}", response.status_code)
+
+        return response
+
+
+    def _then(self, result: Any, func) -> Any:
+        """
+        Apply func to the result of _make_request
+
+        Overridden by the async client, where the result is an awaitable.
+        """
+        return func(result)
+
+
+    def _get_by_ids(self, get: Callable[[Any], Any], ids: Iterable[Any], max_workers: int) -> List[BulkResult]:
+        """
+        Call get on many IDs concurrently, each distinct ID only once
+
+        Overridden by the async client, where get returns an awaitable.
+
+        Returns:
+            List of BulkResult in input order, one per input ID (repeated IDs share the same result)
+        """
+        ids = list(ids)
+        outcomes = {outcome.item: outcome for outcome in self._iter_by_ids(get, ids, max_workers, ordered=False)}
+        return [BulkResult(index, id, outcomes[id].result, outcomes[id].error) for index, id in enumerate(ids)]
+
+
+    def _iter_by_ids(self, get: Callable[[Any], Any], ids: Iterable[Any], max_workers: int, ordered: bool) -> Iterator[BulkResult]:
+        """
+        Lazy version of _get_by_ids, yielding one BulkResult per distinct ID
+
+        Overridden by the async client, where it's an async generator.
+        """
+        for outcome in bounded_map(lambda entry: get(entry[1]), first_occurrences(ids), max_workers, ordered):
+            index, id = outcome.item
+            yield BulkResult(index, id, outcome.result, outcome.error)
+
+
+    def _build_url(self, endpoint: str) -> str:
+        """Build the full URL of an endpoint"""
+        return f"{self.base_url}/{endpoint.lstrip('/')}"
+
+
+    def _parse_response(self, response) -> Any:
+        """
+        Decode a response according to its Content-Type
+
+        JSON bodies are decoded by the decoder of the transport and unwrapped from the
+        {"response": ...} envelope when present, text bodies are returned as str and
+        everything else as bytes.
+        """
+        content_type = response.headers.get('Content-Type', '')
+
+        if 'application/json' in content_type:
+            decoder = getattr(self.transport, "decoder", None) or DEFAULT_DECODER
+            try:
+                return decoder.decode(response.content)
+            except ValueError as e:
+                raise APIError(f"Invalid JSON response: {e}", response.status_code)
+
+        elif 'text/' in content_type:
+            return response.text
+            
+        else:
+            return response.content
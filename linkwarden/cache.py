@@ -0,0 +1,404 @@
+#! -- coding: utf-8 --
+
+import copy
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, Mapping, Optional
+
+# Resources whose cached responses may change when another resource is modified.
+# A modification of a resource not listed here clears the whole cache.
+RELATED_RESOURCES = {
+    "links": ("search", "dashboard", "collections", "tags", "public", "archives"),
+    "collections": ("links", "search", "dashboard", "public"),
+    "tags": ("links", "search", "dashboard", "public"),
+    "users": ("public", "avatar"),
+    "archives": ("links", "public"),
+    "avatar": ("users", "public"),
+    "tokens": (),
+    "session": (),
+    "auth": (),
+}
+
+# Endpoints with large binary bodies, only cached when a rule of ttls opts in
+UNCACHED_BY_DEFAULT = ("/archives",)
+
+
+class CacheEntry:
+    """
+    A cached response
+
+    Attributes:
+        value: The decoded response
+        resource: First segment of the endpoint (e.g. "links"), used for invalidation
+        expires: Timestamp after which the entry must be revalidated
+        etag: ETag header of the response, if any
+        last_modified: Last-Modified header of the response, if any
+    """
+    __slots__ = ("value", "resource", "expires", "etag", "last_modified")
+
+    def __init__(self, value: Any, resource: str, expires: float, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        self.value = value
+        self.resource = resource
+        self.expires = expires
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def fresh(self) -> bool:
+        """Whether the entry can be used without asking the server"""
+        return time.time() < self.expires
+
+    @property
+    def revalidatable(self) -> bool:
+        """Whether the entry has validators for a conditional request"""
+        return bool(self.etag or self.last_modified)
+
+
+class MemoryBackend:
+    """
+    In-memory LRU storage of cache entries
+
+    The entries hold the very objects returned to the callers, so ResponseCache copies them (shares_values).
+
+    Args:
+        max_entries: Maximum number of entries, the least recently used ones are evicted first
+    """
+    shares_values = True
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+
+    def set(self, key: str, entry: CacheEntry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+    def delete_resources(self, resources: Iterable[str]):
+        resources = set(resources)
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if e.resource in resources]:
+                del self._entries[key]
+
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteBackend:
+    """
+    Persistent storage of cache entries, shared by all the processes using the same path
+
+    Metadata and JSON/text bodies are stored in a SQLite database. Binary bodies (archives, avatars)
+    are stored as content-addressed files next to it, named after their SHA-256, so identical
+    payloads are stored once. Short-lived jobs pointing to the same path start with a warm cache.
+
+    Every read decodes a new object, so its values are never copied by ResponseCache.
+
+    Args:
+        path: Path of the SQLite database, created if missing
+        blob_dir: Directory of the binary payloads, "<path>.blobs" by default
+        max_entries: Maximum number of entries, the least recently used ones are evicted first. None for no limit
+        touch_interval: Seconds between two updates of the last access time of an entry. Reads only write
+            to the database when the stored time is older than that, so concurrent readers don't contend
+            for the write lock on every hit, at the cost of a coarser LRU order
+    """
+    shares_values = False
+
+    def __init__(self, path: str, blob_dir: Optional[str] = None, max_entries: Optional[int] = None, touch_interval: float = 60):
+        self.path = path
+        self.blob_dir = blob_dir or path + ".blobs"
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        self._local = threading.local()
+
+        os.makedirs(self.blob_dir, exist_ok=True)
+        with self._connection() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, resource TEXT, kind TEXT, data BLOB, "
+                "expires REAL, etag TEXT, last_modified TEXT, accessed REAL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS entries_resource ON entries (resource)")
+            db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        db = self._connection()
+        row = db.execute("SELECT resource, kind, data, expires, etag, last_modified, accessed FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+
+        resource, kind, data, expires, etag, last_modified, accessed = row
+        now = time.time()
+        if accessed is None or now - accessed >= self.touch_interval:
+            with db:
+                db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+
+        try:
+            value = self._decode(kind, data)
+        except OSError:
+            # The payload file was removed
+            self._delete(key)
+            return None
+
+        return CacheEntry(value, resource, expires, etag, last_modified)
+
+
+    def set(self, key: str, entry: CacheEntry):
+        kind, data = self._encode(entry.value)
+        with self._connection() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, entry.resource, kind, data, entry.expires, entry.etag, entry.last_modified, time.time())
+            )
+            if self.max_entries is not None:
+                db.execute(
+                    "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+
+
+    def delete_resources(self, resources: Iterable[str]):
+        resources = list(resources)
+        with self._connection() as db:
+            db.execute(f"DELETE FROM entries WHERE resource IN ({', '.join('?' * len(resources))})", resources)
+
+
+    def clear(self):
+        with self._connection() as db:
+            db.execute("DELETE FROM entries")
+
+
+    def prune(self) -> int:
+        """
+        Remove the payload files no entry refers to anymore
+
+        Returns:
+            Number of removed files
+        """
+        with self._connection() as db:
+            used = {row[0] for row in db.execute("SELECT data FROM entries WHERE kind = 'blob'")}
+
+        removed = 0
+        for root, _, files in os.walk(self.blob_dir):
+            for name in files:
+                if name not in used and not name.endswith(".tmp"):
+                    os.remove(os.path.join(root, name))
+                    removed += 1
+        return removed
+
+
+    def __len__(self):
+        with self._connection() as db:
+            return db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+
+    def _connection(self) -> "sqlite3.Connection":
+        """SQLite connection of the current thread"""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            import sqlite3
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+
+    def _delete(self, key: str):
+        with self._connection() as db:
+            db.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+
+    def _encode(self, value: Any):
+        """Serialize a value to (kind, data), binary values are written to a payload file"""
+        if isinstance(value, bytes):
+            digest = hashlib.sha256(value).hexdigest()
+            path = self._blob_path(digest)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # Write then rename, so other processes never read a partial file
+                fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    f.write(value)
+                os.replace(temp_path, path)
+            return "blob", digest
+
+        if isinstance(value, str):
+            return "text", value
+
+        return "json", json.dumps(value)
+
+
+    def _decode(self, kind: str, data: Any) -> Any:
+        if kind == "blob":
+            with open(self._blob_path(data), "rb") as f:
+                return f.read()
+
+        if kind == "text":
+            return data
+
+        return json.loads(data)
+
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+
+class ResponseCache:
+    """
+    Client-side cache of GET responses
+
+    Set it on the transport to enable it for every resource of an Api:
+    Api(api_key, transport=Transport(cache=ResponseCache(default_ttl=30, ttls={"/collections": 300})))
+
+    A fresh entry is returned without any request. A stale entry with an ETag or Last-Modified
+    is revalidated with a conditional request, and kept if the server answers 304.
+    Any successful POST, PUT or DELETE made through the same transport invalidates the cached
+    responses of the modified resource and of the resources depending on it.
+
+    Binary bodies (archives, avatars) and the /archives endpoints are only cached when a rule
+    of ttls matches them, so multi-MB payloads don't fill the in-memory LRU by default.
+    With the in-memory backend, cached dictionaries and lists are deep-copied when they're stored and on
+    every hit, so callers can modify them freely. Callers that never do can pass copy_values=False to skip
+    that cost and share the cached objects. Responses that aren't stored and the values decoded by the
+    SQLite backend are never copied.
+
+    Args:
+        default_ttl: Seconds a response stays fresh, when no rule of ttls matches
+        ttls: Per-endpoint TTLs, the longest matching endpoint prefix wins (e.g. {"/tags": 600, "/search": None}).
+            None disables caching for the endpoint, 0 always revalidates
+        max_entries: Maximum number of entries of the default in-memory backend
+        backend: Storage of the entries, a MemoryBackend by default. Use a SQLiteBackend to persist
+            the cache across runs and share it between processes. A backend whose shares_values is True
+            keeps the stored objects, which are then copied
+        copy_values: Whether to return copies of the cached dictionaries and lists
+    """
+    def __init__(self,
+                 default_ttl: Optional[float] = 60,
+                 ttls: Optional[Mapping[str, Optional[float]]] = None,
+                 max_entries: int = 1024,
+                 backend=None,
+                 copy_values: bool = True
+                 ):
+        self.default_ttl = default_ttl
+        self.ttls = sorted(((prefix.rstrip("/") or "/", ttl) for prefix, ttl in (ttls or {}).items()), key=lambda rule: len(rule[0]), reverse=True)
+        self.backend = backend if backend is not None else MemoryBackend(max_entries)
+        self.copy_values = copy_values
+
+
+    def ttl_for(self, endpoint: str, binary: bool = False) -> Optional[float]:
+        """TTL of an endpoint, None if it must not be cached. Binary bodies are only cached when a rule matches"""
+        endpoint = "/" + endpoint.strip("/")
+        for prefix, ttl in self.ttls:
+            if endpoint == prefix or endpoint.startswith(prefix + "/") or prefix == "/":
+                return ttl
+
+        if binary or any(endpoint == prefix or endpoint.startswith(prefix + "/") for prefix in UNCACHED_BY_DEFAULT):
+            return None
+        return self.default_ttl
+
+
+    def key(self, api_key: str, url: str, params: Any = None) -> str:
+        """Cache key of a request, the API key is hashed with it so different users never share entries"""
+        if isinstance(params, Mapping):
+            params = sorted((str(k), str(v)) for k, v in params.items())
+        raw = json.dumps([api_key, url, params], default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Get an entry, fresh or stale"""
+        return self.backend.get(key)
+
+
+    def store(self, key: str, endpoint: str, value: Any, headers: Mapping[str, str]) -> Optional[CacheEntry]:
+        """
+        Store a response
+
+        Returns:
+            The stored entry, None if the endpoint or the response can't be cached
+        """
+        ttl = self.ttl_for(endpoint, isinstance(value, bytes))
+        if ttl is None or "no-store" in headers.get("Cache-Control", ""):
+            return None
+
+        entry = CacheEntry(value, self.resource_of(endpoint), time.time() + ttl, headers.get("ETag"), headers.get("Last-Modified"))
+        if ttl <= 0 and not entry.revalidatable:
+            return None
+
+        self.backend.set(key, entry)
+        return entry
+
+
+    def refresh(self, key: str, endpoint: str, entry: CacheEntry, headers: Mapping[str, str]):
+        """Mark an entry fresh again after a 304 Not Modified"""
+        entry.expires = time.time() + (self.ttl_for(endpoint) or 0)
+        entry.etag = headers.get("ETag", entry.etag)
+        entry.last_modified = headers.get("Last-Modified", entry.last_modified)
+        self.backend.set(key, entry)
+
+
+    def invalidate(self, endpoint: str):
+        """Drop the entries that may be affected by a modification of the endpoint"""
+        resource = self.resource_of(endpoint)
+        if resource not in RELATED_RESOURCES:
+            self.backend.clear()
+            return
+        self.backend.delete_resources((resource,) + RELATED_RESOURCES[resource])
+
+
+    def clear(self):
+        """Drop all the entries"""
+        self.backend.clear()
+
+
+    @staticmethod
+    def conditional_headers(entry: CacheEntry) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers to revalidate an entry"""
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+
+    @staticmethod
+    def resource_of(endpoint: str) -> str:
+        return endpoint.strip("/").split("/", 1)[0]
+
+
+    def copy_value(self, value: Any) -> Any:
+        """
+        Copy of a cached value, so callers can't modify the cached one
+
+        A full deepcopy, only when copy_values is True and the backend shares its values.
+        """
+        if self.copy_values and getattr(self.backend, "shares_values", True) and isinstance(value, (dict, list)):
+            return copy.deepcopy(value)
+        return value
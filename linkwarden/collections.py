@@ -1,35 +1,43 @@
 #! -- coding: utf-8 --
 
 from .base import Base
-from typing import Dict, Any
+from .transport import Transport
+from .models import Collection, to_models
+from .concurrency import BulkResult
+from typing import Dict, Any, Iterable, Iterator, List, Optional
 
 class Collections(Base):
     """Class for managing collections"""
 
-    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1"):
-        super().__init__(api_key, base_url, api_version)
+    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1", transport: Optional[Transport]=None):
+        super().__init__(api_key, base_url, api_version, transport)
         self.collections_endpoint = "/collections"
 
 
-    def get_collections(self) -> Dict[str, Any]:
+    def get_collections(self, as_model: bool = False) -> Dict[str, Any]:
         """
         Get all collections
 
+        Args:
+            as_model: Return Collection models instead of dictionaries
+
         Returns:
             List of collection dictionaries
 
         Raises:
             APIError: If the API request fails
         """
-        return self._make_request("GET", self.collections_endpoint)
+        result = self._make_request("GET", self.collections_endpoint)
+        return self._then(result, lambda items: to_models(items, Collection)) if as_model else result
     
 
-    def get_collection(self, id: int) -> Dict[str, Any]:
+    def get_collection(self, id: int, as_model: bool = False) -> Dict[str, Any]:
         """
         Get a collection by ID
 
         Args:
             id: The ID of the collection to get
+            as_model: Return a Collection model instead of a dictionary
 
         Returns:
             Collection dictionary
@@ -37,7 +45,44 @@ class Collections(Base):
         Raises:
             APIError: If the API request fails
         """
-        return self._make_request("GET", f"{self.collections_endpoint}/{id}")
+        result = self._make_request("GET", f"{self.collections_endpoint}/{id}")
+        return self._then(result, lambda item: to_models(item, Collection)) if as_model else result
+
+
+    def get_collections_by_ids(self, ids: Iterable[int], max_workers: int = 8, as_model: bool = False) -> List[BulkResult]:
+        """
+        Get many collections by ID, concurrently
+
+        Repeated IDs are requested only once, and the IDs fresh in the response cache of the
+        transport (if any, sync client only) are served from it. A failed ID (e.g. a deleted collection) doesn't stop the others.
+
+        Args:
+            ids: Iterable of collection IDs
+            max_workers: Maximum number of concurrent requests
+            as_model: Return Collection models instead of dictionaries
+
+        Returns:
+            List of BulkResult in input order, with the ID as item and the collection as result, or the error
+        """
+        return self._get_by_ids(lambda id: self.get_collection(id, as_model), ids, max_workers)
+
+
+    def iter_collections_by_ids(self, ids: Iterable[int], max_workers: int = 8, ordered: bool = False, as_model: bool = False) -> Iterator[BulkResult]:
+        """
+        Same as get_collections_by_ids, but yields the results as they arrive
+
+        The IDs are consumed lazily, so they can come from a generator over millions of them.
+
+        Args:
+            ids: Iterable of collection IDs
+            max_workers: Maximum number of concurrent requests
+            ordered: Whether to yield the results in input order, otherwise as soon as they complete
+            as_model: Return Collection models instead of dictionaries
+
+        Yields:
+            One BulkResult per distinct ID, its index is the position of the first occurrence of the ID in the input
+        """
+        return self._iter_by_ids(lambda id: self.get_collection(id, as_model), ids, max_workers, ordered)
     
 
     def create_collection(self, 
@@ -0,0 +1,289 @@
+#! -- coding: utf-8 --
+"""
+Columnar batches of link metadata, for analytics
+
+Links coming from the search endpoint or from an export are packed page by page into
+LinkBatch objects holding one compact array per field, and can be written to CSV, or to
+Parquet / Arrow IPC files with pyarrow (pip install pyarrow), without ever building the
+full list of link dictionaries.
+"""
+
+import csv
+import importlib
+import math
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, Any, BinaryIO, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+# Imported on first use by _require_pyarrow, it takes longer to import than the rest of the package
+pyarrow = None
+
+from .jsonstream import iter_export
+from .pagination import iter_pages
+
+# Stored in the integer columns when the value is missing
+NULL_ID = -1
+
+COLUMNS = ("id", "name", "url", "type", "collection_id", "tag_ids", "created_at", "updated_at")
+
+
+class LinkBatch:
+    """
+    A batch of links stored column by column
+
+    Integer columns are array("q") (NULL_ID when missing), timestamps are array("d") of
+    UNIX seconds (NaN when missing), and the tag IDs are stored Arrow-style as a flat
+    array of values plus an array of offsets: the tags of the i-th link are
+    tag_values[tag_offsets[i]:tag_offsets[i + 1]].
+
+    Attributes:
+        id, collection_id: array("q")
+        name, url, type: lists of strings
+        tag_offsets, tag_values: array("q")
+        created_at, updated_at: array("d")
+    """
+    __slots__ = ("id", "name", "url", "type", "collection_id", "tag_offsets", "tag_values", "created_at", "updated_at")
+
+    def __init__(self, links: Iterable[Dict[str, Any]] = ()):
+        self.id = array("q")
+        self.name = []
+        self.url = []
+        self.type = []
+        self.collection_id = array("q")
+        self.tag_offsets = array("q", [0])
+        self.tag_values = array("q")
+        self.created_at = array("d")
+        self.updated_at = array("d")
+
+        for link in links:
+            self.append(link)
+
+
+    def append(self, link: Dict[str, Any]):
+        """Add a link dictionary (or Link model) to the batch"""
+        self.id.append(link["id"])
+        self.name.append(link.get("name"))
+        self.url.append(link.get("url"))
+        self.type.append(link.get("type"))
+
+        collection_id = link.get("collectionId")
+        if collection_id is None:
+            collection = link.get("collection")
+            collection_id = collection.get("id") if collection is not None else None
+        self.collection_id.append(NULL_ID if collection_id is None else collection_id)
+
+        for tag in link.get("tags") or ():
+            self.tag_values.append(tag["id"])
+        self.tag_offsets.append(len(self.tag_values))
+
+        self.created_at.append(_timestamp(link.get("createdAt")))
+        self.updated_at.append(_timestamp(link.get("updatedAt")))
+
+
+    def tag_ids(self, index: int) -> List[int]:
+        """Tag IDs of the link at the given position"""
+        return self.tag_values[self.tag_offsets[index]:self.tag_offsets[index + 1]].tolist()
+
+
+    def rows(self) -> Iterator[Tuple]:
+        """Iterate over the links as tuples of Python values in COLUMNS order, None for the missing values"""
+        for index in range(len(self)):
+            collection_id = self.collection_id[index]
+            yield (
+                self.id[index],
+                self.name[index],
+                self.url[index],
+                self.type[index],
+                None if collection_id == NULL_ID else collection_id,
+                self.tag_ids(index),
+                _datetime(self.created_at[index]),
+                _datetime(self.updated_at[index]),
+            )
+
+
+    def to_pydict(self) -> Dict[str, list]:
+        """The columns as a dictionary of lists, e.g. for pandas.DataFrame(batch.to_pydict())"""
+        return {name: list(column) for name, column in zip(COLUMNS, zip(*self.rows()))} if len(self) else {name: [] for name in COLUMNS}
+
+
+    def to_arrow(self) -> "pyarrow.RecordBatch":
+        """
+        Convert the batch to a pyarrow RecordBatch
+
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        _require_pyarrow()
+        tags = pyarrow.ListArray.from_arrays(pyarrow.array(self.tag_offsets, pyarrow.int32()), pyarrow.array(self.tag_values, pyarrow.int64()))
+
+        return pyarrow.RecordBatch.from_arrays([
+            pyarrow.array(self.id, pyarrow.int64()),
+            pyarrow.array(self.name, pyarrow.string()),
+            pyarrow.array(self.url, pyarrow.string()),
+            pyarrow.array(self.type, pyarrow.string()),
+            pyarrow.array([None if value == NULL_ID else value for value in self.collection_id], pyarrow.int64()),
+            tags,
+            _arrow_timestamps(self.created_at),
+            _arrow_timestamps(self.updated_at),
+        ], schema=arrow_schema())
+
+
+    def __len__(self):
+        return len(self.id)
+
+
+def link_batches(links: Iterable[Dict[str, Any]], batch_size: int = 1000) -> Iterator[LinkBatch]:
+    """
+    Pack a stream of links in batches of batch_size links
+
+    Args:
+        links: Iterable of link dictionaries, consumed lazily (e.g. Search.iter_links)
+        batch_size: Number of links per batch
+    """
+    batch = LinkBatch()
+    for link in links:
+        batch.append(link)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = LinkBatch()
+    if len(batch):
+        yield batch
+
+
+def search_batches(search, query: str = "", prefetch: bool = True) -> Iterator[LinkBatch]:
+    """
+    One LinkBatch per page of search results
+
+    Args:
+        search: The Search instance
+        query: The query to search for, "" for all the links
+        prefetch: Whether to fetch the next page in a background thread while the current one is converted
+    """
+    for page in iter_pages(lambda cursor: search.search_links(query, cursor or 0), read_ahead=1 if prefetch else 0):
+        yield LinkBatch(page)
+
+
+def export_batches(source: Union[str, BinaryIO, Iterable[bytes]], batch_size: int = 1000) -> Iterator[LinkBatch]:
+    """
+    Batches of the links of a Linkwarden JSON export, parsed incrementally
+
+    Args:
+        source: Path of the export file, a binary file object or an iterable of bytes chunks
+            (e.g. from Migration.export_to_file, or a streamed response)
+        batch_size: Number of links per batch
+    """
+    return link_batches((item for kind, item in iter_export(source) if kind == "link"), batch_size)
+
+
+def write_csv(batches: Iterable[LinkBatch], destination: Union[str, TextIO]) -> int:
+    """
+    Write batches to a CSV file with a header row, tag IDs are separated by ";"
+
+    Args:
+        batches: Iterable of LinkBatch
+        destination: Path of the file, or a text file object
+
+    Returns:
+        Number of rows written
+    """
+    if isinstance(destination, str):
+        with open(destination, "w", newline="", encoding="utf-8") as f:
+            return write_csv(batches, f)
+
+    writer = csv.writer(destination)
+    writer.writerow(COLUMNS)
+    count = 0
+    for batch in batches:
+        for row in batch.rows():
+            *fields, tag_ids, created_at, updated_at = row
+            writer.writerow(fields + [
+                ";".join(map(str, tag_ids)),
+                created_at.isoformat() if created_at else None,
+                updated_at.isoformat() if updated_at else None,
+            ])
+        count += len(batch)
+    return count
+
+
+def write_parquet(batches: Iterable[LinkBatch], path: str, compression: str = "zstd") -> int:
+    """
+    Write batches to a Parquet file, one row group per batch
+
+    Returns:
+        Number of rows written
+
+    Raises:
+        ImportError: If pyarrow is not installed
+    """
+    _require_pyarrow()
+    parquet = importlib.import_module("pyarrow.parquet")
+
+    count = 0
+    with parquet.ParquetWriter(path, arrow_schema(), compression=compression) as writer:
+        for batch in batches:
+            writer.write_batch(batch.to_arrow())
+            count += len(batch)
+    return count
+
+
+def write_ipc(batches: Iterable[LinkBatch], path: str) -> int:
+    """
+    Write batches to an Arrow IPC (Feather v2) file
+
+    Returns:
+        Number of rows written
+
+    Raises:
+        ImportError: If pyarrow is not installed
+    """
+    _require_pyarrow()
+    ipc = importlib.import_module("pyarrow.ipc")
+
+    count = 0
+    with pyarrow.OSFile(path, "wb") as sink, ipc.new_file(sink, arrow_schema()) as writer:
+        for batch in batches:
+            writer.write_batch(batch.to_arrow())
+            count += len(batch)
+    return count
+
+
+def arrow_schema() -> "pyarrow.Schema":
+    """Arrow schema of the link batches"""
+    _require_pyarrow()
+    return pyarrow.schema([
+        ("id", pyarrow.int64()),
+        ("name", pyarrow.string()),
+        ("url", pyarrow.string()),
+        ("type", pyarrow.string()),
+        ("collection_id", pyarrow.int64()),
+        ("tag_ids", pyarrow.list_(pyarrow.int64())),
+        ("created_at", pyarrow.timestamp("ms", tz="UTC")),
+        ("updated_at", pyarrow.timestamp("ms", tz="UTC")),
+    ])
+
+
+def _require_pyarrow():
+    global pyarrow
+    if pyarrow is None:
+        try:
+            pyarrow = importlib.import_module("pyarrow")
+        except ImportError:
+            raise ImportError("Parquet and Arrow output require pyarrow, install it with: pip install pyarrow") from None
+
+
+def _arrow_timestamps(column: array) -> "pyarrow.Array":
+    return pyarrow.array([None if math.isnan(value) else int(value * 1000) for value in column], pyarrow.timestamp("ms", tz="UTC"))
+
+
+def _timestamp(value: Optional[str]) -> float:
+    """UNIX seconds of an ISO 8601 date, NaN if missing or invalid"""
+    if not value:
+        return math.nan
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _datetime(value: float) -> Optional[datetime]:
+    return None if math.isnan(value) else datetime.fromtimestamp(value, timezone.utc)
@@ -0,0 +1,160 @@
+#! -- coding: utf-8 --
+"""
+Helpers to run many API calls concurrently on a bounded thread pool
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Awaitable, Callable, Iterable, Iterator, List, Optional, Tuple
+
+
+class BulkResult:
+    """
+    Outcome of one item of a bulk operation
+
+    Attributes:
+        index: Position of the item in the input
+        item: The input item
+        result: The value returned for the item, None if it failed
+        error: The exception raised for the item, None if it succeeded
+        skipped: Whether the item was deliberately not processed (e.g. a duplicate)
+    """
+    __slots__ = ("index", "item", "result", "error", "skipped")
+
+    def __init__(self, index: int, item: Any, result: Any = None, error: Optional[Exception] = None, skipped: bool = False):
+        self.index = index
+        self.item = item
+        self.result = result
+        self.error = error
+        self.skipped = skipped
+
+    @property
+    def ok(self) -> bool:
+        """Whether the item succeeded"""
+        return self.error is None
+
+    def __repr__(self):
+        if self.skipped:
+            return f"BulkResult(index={self.index}, skipped=True)"
+        if self.ok:
+            return f"BulkResult(index={self.index}, result={self.result!r})"
+        return f"BulkResult(index={self.index}, error={self.error!r})"
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Split an iterable in lists of at most size items, lazily
+
+    Args:
+        items: Iterable of items
+        size: Maximum size of each chunk
+
+    Yields:
+        Lists of items
+    """
+    if size < 1:
+        raise ValueError("Chunk size must be at least 1")
+
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def first_occurrences(items: Iterable[Any]) -> Iterator[Tuple[int, Any]]:
+    """
+    Lazily drop the repeated items of an iterable
+
+    Yields:
+        (position in the input, item) of the first occurrence of each item
+    """
+    seen = set()
+    for index, item in enumerate(items):
+        if item not in seen:
+            seen.add(item)
+            yield index, item
+
+
+def bounded_map(func: Callable[[Any], Any], items: Iterable[Any], max_workers: int = 8, ordered: bool = True) -> Iterator[BulkResult]:
+    """
+    Call func on every item using a pool of threads, yielding a BulkResult per item
+
+    The input is consumed lazily and at most 2 * max_workers items are in flight at any time,
+    so it works with arbitrarily large iterables. An exception raised for one item is stored
+    in its BulkResult and doesn't stop the others.
+
+    Args:
+        func: Function called with each item
+        items: Iterable of items
+        max_workers: Maximum number of concurrent calls
+        ordered: Whether to yield the results in input order, otherwise they are yielded as soon as they complete
+
+    Yields:
+        BulkResult objects
+    """
+    def call(index, item):
+        try:
+            return BulkResult(index, item, result=func(item))
+        except Exception as e:
+            return BulkResult(index, item, error=e)
+
+    window = max(1, max_workers) * 2
+    iterator = enumerate(items)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        exhausted = False
+
+        try:
+            while True:
+                while not exhausted and len(pending) < window:
+                    try:
+                        index, item = next(iterator)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending.append(executor.submit(call, index, item))
+
+                if not pending:
+                    return
+
+                if ordered:
+                    yield pending.popleft().result()
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.remove(future)
+                        yield future.result()
+        finally:
+            # The consumer stopped early, don't start the queued calls
+            for future in pending:
+                future.cancel()
+
+
+async def abounded_map(func: Callable[[Any], Awaitable[Any]], items: Iterable[Any], max_workers: int = 8) -> List[BulkResult]:
+    """
+    Async version of bounded_map: await func on every item with at most max_workers calls at a time
+
+    The input is consumed lazily by max_workers worker tasks.
+
+    Returns:
+        List of BulkResult in input order
+    """
+    import asyncio
+    iterator = enumerate(items)
+    results = []
+
+    async def worker():
+        for index, item in iterator:
+            try:
+                results.append(BulkResult(index, item, result=await func(item)))
+            except Exception as e:
+                results.append(BulkResult(index, item, error=e))
+
+    await asyncio.gather(*[worker() for _ in range(max(1, max_workers))])
+    results.sort(key=lambda outcome: outcome.index)
+    return results
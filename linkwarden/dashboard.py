@@ -1,14 +1,15 @@
 #! -- coding: utf-8 --
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from .base import Base
+from .transport import Transport
 
 
 class Dashboard(Base):
     """Get Dashboard data for the user"""
 
-    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1"):
-        super().__init__(api_key, base_url, api_version)
+    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1", transport: Optional[Transport]=None):
+        super().__init__(api_key, base_url, api_version, transport)
         self.dashboard_endpoint = "/dashboard"
 
 
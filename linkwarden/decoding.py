@@ -0,0 +1,106 @@
+#! -- coding: utf-8 --
+
+import json
+import re
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+# Start of the {"response": ...} envelope of most endpoints
+_ENVELOPE = re.compile(rb'\s*\{\s*"response"\s*:')
+
+
+class JSONDecoder:
+    """
+    JSON decoder of the response bodies, used through the transports
+
+    It uses orjson or msgspec when installed, which decode large search and export pages faster
+    than the json module. When the body is only the {"response": ...} envelope, they decode the
+    inner value directly from a zero-copy slice of the body, without building the outer object.
+
+    Args:
+        backend: "orjson", "msgspec", "json", or "auto" for the fastest one installed
+        skip_envelope: Whether to decode the inside of the envelope directly. Ignored by the json backend,
+            which would have to copy the slice
+
+    Raises:
+        ImportError: If the requested backend is not installed
+    """
+    def __init__(self, backend: str = "auto", skip_envelope: bool = True):
+        if backend == "auto":
+            backend = "orjson" if orjson is not None else "msgspec" if msgspec is not None else "json"
+
+        if backend not in BACKENDS:
+            raise ValueError(f"Invalid backend. Valid backends are: auto, {', '.join(BACKENDS)}")
+        if backend == "orjson" and orjson is None:
+            raise ImportError("The orjson backend requires orjson, install it with: pip install orjson")
+        if backend == "msgspec" and msgspec is None:
+            raise ImportError("The msgspec backend requires msgspec, install it with: pip install msgspec")
+
+        self.backend = backend
+        self.skip_envelope = skip_envelope
+
+        if backend == "orjson":
+            self.loads = orjson.loads
+        elif backend == "msgspec":
+            self.loads = msgspec.json.decode
+        else:
+            self.loads = json.loads
+
+
+    def decode(self, body: Union[bytes, str]) -> Any:
+        """
+        Decode a response body, unwrapping the {"response": ...} envelope when present
+
+        Raises:
+            ValueError: If the body isn't valid JSON
+        """
+        if isinstance(body, str):
+            body = body.encode()
+
+        if self.skip_envelope and self.backend != "json":
+            inner = self._envelope_content(body)
+            if inner is not None:
+                try:
+                    return self.loads(inner)
+                except Exception:
+                    # The envelope has other keys after "response", decode the whole body
+                    pass
+
+        try:
+            result = self.loads(body)
+        except Exception as e:
+            raise ValueError(str(e)) from e
+
+        if isinstance(result, dict) and "response" in result:
+            return result["response"]
+
+        return result
+
+
+    @staticmethod
+    def _envelope_content(body: bytes) -> Optional[memoryview]:
+        """Slice of the body between {"response": and the closing brace, None if it doesn't look like an envelope"""
+        match = _ENVELOPE.match(body)
+        if match is None:
+            return None
+
+        end = len(body.rstrip())
+        if end == 0 or body[end - 1:end] != b"}":
+            return None
+
+        return memoryview(body)[match.end():end - 1]
+
+
+    def __repr__(self):
+        return f"JSONDecoder(backend={self.backend!r})"
@@ -0,0 +1,194 @@
+#! -- coding: utf-8 --
+
+import json
+import os
+from typing import Dict, Any, Iterable, Optional
+
+from .archives import Archives, ARCHIVE_FORMATS
+from .base import APIError
+from .concurrency import bounded_map
+
+class ArchiveExporter:
+    """
+    Bulk exporter of archive files
+
+    Downloads the archives of many links in many formats concurrently to a directory,
+    as <link_id>.<extension> files, and keeps a manifest.json with the size, ETag and
+    checksum of every file. Files already on disk with the size recorded in the manifest
+    are skipped, so an interrupted or nightly export only downloads what's missing.
+
+    Each finished file is appended as one JSON line to a journal next to the manifest
+    (manifest.json.log), so a crash loses at most the file being written. The journal is
+    replayed when the exporter is created and compacted into the manifest at the end of export.
+
+    Args:
+        archives: The Archives instance used to download the files
+        directory: Destination directory, created if missing
+        max_workers: Maximum number of concurrent downloads. The transport pool_maxsize should be at least as big
+        checksum: Name of a hashlib algorithm to compute for each file (optional)
+        manifest_name: Name of the manifest file inside the directory
+        flush_every: Force the journal to disk (fsync) every flush_every completed files
+    """
+    def __init__(self,
+                 archives: Archives,
+                 directory: str,
+                 max_workers: int = 8,
+                 checksum: Optional[str] = None,
+                 manifest_name: str = "manifest.json",
+                 flush_every: int = 1000
+                 ):
+        self.archives = archives
+        self.directory = directory
+        self.max_workers = max_workers
+        self.checksum = checksum
+        self.manifest_path = os.path.join(directory, manifest_name)
+        self.journal_path = self.manifest_path + ".log"
+        self.flush_every = flush_every
+
+        os.makedirs(directory, exist_ok=True)
+        self.manifest = self._load_manifest()
+
+
+    def export(self,
+               link_ids: Iterable[int],
+               formats: Iterable[int] = tuple(ARCHIVE_FORMATS),
+               revalidate: bool = False
+               ) -> Dict[str, int]:
+        """
+        Download the archives of the given links
+
+        Args:
+            link_ids: IDs of the links to export, consumed lazily
+            formats: Archive formats to export for each link (0 = PNG, 1 = JPEG, 2 = PDF, 3 = JSON, 4 = HTML)
+            revalidate: For files already on disk, ask the server whether they changed (If-None-Match with the stored ETag)
+                instead of skipping them without any request
+
+        Returns:
+            Count of files "downloaded", "skipped" (already up to date), "missing" (404, the link has no archive in that format)
+            and "failed"
+
+        Raises:
+            ValueError: If a format is invalid
+        """
+        formats = list(formats)
+        for format in formats:
+            if format not in ARCHIVE_FORMATS:
+                raise ValueError("Invalid format. Valid formats are: 0 = PNG, 1 = JPEG, 2 = PDF, 3 = JSON, 4 = HTML")
+
+        jobs = ((link_id, format) for link_id in link_ids for format in formats)
+        summary = {"downloaded": 0, "skipped": 0, "missing": 0, "failed": 0}
+
+        journal = open(self.journal_path, "a")
+        try:
+            for done, outcome in enumerate(bounded_map(lambda job: self._export_one(*job, revalidate), jobs, self.max_workers, ordered=False), 1):
+                key = self._key(*outcome.item)
+
+                if outcome.ok:
+                    status, entry = outcome.result
+                    record = {"key": key, "entry": entry}
+                    summary[status] += 1
+                elif isinstance(outcome.error, APIError) and outcome.error.status_code == 404:
+                    record = {"key": key, "error": "not found", "missing": True}
+                    summary["missing"] += 1
+                else:
+                    record = {"key": key, "error": str(outcome.error)}
+                    summary["failed"] += 1
+
+                self._apply(record)
+                journal.write(json.dumps(record) + "\n")
+                journal.flush()
+                if done % self.flush_every == 0:
+                    os.fsync(journal.fileno())
+        finally:
+            journal.close()
+            self.save_manifest()
+
+        return summary
+
+
+    def save_manifest(self):
+        """Atomically write the manifest to disk and empty the journal, whose records it now contains"""
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.manifest, f)
+        os.replace(temp_path, self.manifest_path)
+
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+
+    def _export_one(self, link_id: int, format: int, revalidate: bool):
+        """Download one archive unless the copy on disk is up to date, returns (status, manifest entry)"""
+        key = self._key(link_id, format)
+        filename = f"{link_id}.{ARCHIVE_FORMATS[format]}"
+        path = os.path.join(self.directory, filename)
+        entry = self.manifest["files"].get(key)
+
+        up_to_date = entry is not None and os.path.isfile(path) and os.path.getsize(path) == entry["size"]
+        if up_to_date and not (revalidate and entry.get("etag")):
+            return "skipped", entry
+
+        temp_path = path + ".part"
+        try:
+            result = self.archives.download_archive(
+                link_id, format, temp_path,
+                checksum=self.checksum,
+                if_none_match=entry.get("etag") if up_to_date else None
+            )
+            if result["not_modified"]:
+                return "skipped", entry
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        return "downloaded", {
+            "link_id": link_id,
+            "format": format,
+            "file": filename,
+            "size": result["size"],
+            "etag": result["etag"],
+            "checksum": result["checksum"]
+        }
+
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        """Load the manifest of a previous export, if any, and replay its journal"""
+        self.manifest = {"files": {}, "errors": {}}
+
+        if os.path.isfile(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+            self.manifest.setdefault("files", {})
+            self.manifest.setdefault("errors", {})
+
+        if os.path.isfile(self.journal_path):
+            with open(self.journal_path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # The last line of a crashed export can be incomplete
+                        break
+                    self._apply(record)
+            # Compact right away, so new records are never appended after an incomplete line
+            self.save_manifest()
+
+        return self.manifest
+
+
+    def _apply(self, record: Dict[str, Any]):
+        """Apply a journal record to the manifest"""
+        key = record["key"]
+        if "entry" in record:
+            self.manifest["files"][key] = record["entry"]
+            self.manifest["errors"].pop(key, None)
+        else:
+            if record.get("missing"):
+                self.manifest["files"].pop(key, None)
+            self.manifest["errors"][key] = record["error"]
+
+
+    @staticmethod
+    def _key(link_id: int, format: int) -> str:
+        return f"{link_id}/{format}"
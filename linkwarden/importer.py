@@ -0,0 +1,367 @@
+#! -- coding: utf-8 --
+
+import codecs
+import html
+import json
+import os
+from html.parser import HTMLParser
+from typing import Dict, Any, BinaryIO, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .concurrency import bounded_map
+from .jsonstream import _Reader
+from .migration import Migration, IMPORT_FORMATS
+
+# A record is (group key, group header, serialized item or None for an empty group, size in bytes)
+Record = Tuple[Any, Any, Optional[str], int]
+
+
+class MigrationImporter:
+    """
+    Streaming importer of large migration files
+
+    The input file is parsed incrementally and split into batches of at most batch_size links
+    (and about max_batch_bytes), each one re-encoded in the same format and sent with
+    Migration.import_data, with up to max_workers batches uploading at a time. Only a few batches
+    are ever held in memory, so the size of the file doesn't matter.
+
+    With a checkpoint file, the batches already imported are recorded as they complete: running the
+    same import again after a failure or an interruption only sends the batches that are missing.
+
+    The server imports each batch on its own. Depending on its version, a collection whose links are
+    split across several batches may be created more than once, a bigger batch_size reduces the splits.
+
+    Args:
+        migration: The Migration instance used to import the batches
+        batch_size: Maximum number of links per batch
+        max_batch_bytes: Approximate maximum size of a batch, keep it below the server body limit
+        max_workers: Maximum number of concurrent uploads
+        checkpoint: Path of the checkpoint file (optional)
+    """
+    def __init__(self,
+                 migration: Migration,
+                 batch_size: int = 500,
+                 max_batch_bytes: int = 4 * 1024 * 1024,
+                 max_workers: int = 2,
+                 checkpoint: Optional[str] = None
+                 ):
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1")
+
+        self.migration = migration
+        self.batch_size = batch_size
+        self.max_batch_bytes = max_batch_bytes
+        self.max_workers = max_workers
+        self.checkpoint = checkpoint
+
+
+    def import_file(self,
+                    source: Union[str, BinaryIO],
+                    format: int,
+                    chunk_size: int = 1024 * 1024,
+                    progress: Optional[Callable[[int], None]] = None
+                    ) -> Dict[str, int]:
+        """
+        Import a file
+
+        Args:
+            source: Path of the file, or a file object opened in binary mode
+            format: Format of the file (0 = LinkWarden JSON, 1 = Netscape bookmarks HTML, 2 = Wallabag JSON)
+            chunk_size: Size of the chunks read from the file
+            progress: Called after each imported batch with the number of links imported so far
+
+        Returns:
+            Number of "batches" and "links" imported, batches "skipped" because the checkpoint
+            marks them as done, and "failed" batches
+
+        Raises:
+            ValueError: If the format is invalid, the file can't be parsed, or the checkpoint
+                belongs to another import
+        """
+        if format not in IMPORT_FORMATS:
+            raise ValueError("Invalid format. Valid formats are: 0 = LinkWarden JSON, 1 = HTML, 2 = Wallabag JSON")
+
+        state = self._load_checkpoint(source, format)
+        done = set(state["done"])
+        summary = {"batches": 0, "links": 0, "skipped": 0, "failed": 0}
+
+        def pending():
+            for index, batch in enumerate(self._batches(source, format, chunk_size)):
+                if index in done:
+                    summary["skipped"] += 1
+                    continue
+                yield index, batch
+
+        def upload(job):
+            _, (data, _) = job
+            return self.migration.import_data(data, format=format)
+
+        try:
+            for outcome in bounded_map(upload, pending(), self.max_workers, ordered=False):
+                index, (_, count) = outcome.item
+                if outcome.ok:
+                    done.add(index)
+                    state["errors"].pop(str(index), None)
+                    summary["batches"] += 1
+                    summary["links"] += count
+                    if progress:
+                        progress(summary["links"])
+                else:
+                    state["errors"][str(index)] = str(outcome.error)
+                    summary["failed"] += 1
+
+                state["done"] = sorted(done)
+                self._save_checkpoint(state)
+        finally:
+            state["done"] = sorted(done)
+            self._save_checkpoint(state)
+
+        return summary
+
+
+    def _batches(self, source: Union[str, BinaryIO], format: int, chunk_size: int) -> Iterator[Tuple[str, int]]:
+        """Split the file into (data, number of links) batches"""
+        chunks = self._chunks(source, chunk_size)
+
+        if format == 0:
+            return self._group(self._linkwarden_records(chunks), self._render_linkwarden)
+        if format == 1:
+            return self._group(self._html_records(chunks), self._render_html)
+        return self._group(self._wallabag_records(chunks), self._render_wallabag)
+
+
+    def _group(self, records: Iterable[Record], render: Callable[[Dict[Any, Tuple[Any, List[str]]]], str]) -> Iterator[Tuple[str, int]]:
+        """Pack the records in batches, keeping the records of a group (collection, folder) together"""
+        groups = {}
+        count = size = 0
+
+        for key, header, item, item_size in records:
+            if item is not None and count and (count >= self.batch_size or size + item_size > self.max_batch_bytes):
+                yield render(groups), count
+                groups = {}
+                count = size = 0
+
+            items = groups.setdefault(key, (header, []))[1]
+            if item is not None:
+                items.append(item)
+                count += 1
+                size += item_size
+
+        if groups:
+            yield render(groups), count
+
+
+    @staticmethod
+    def _linkwarden_records(chunks: Iterable[bytes]) -> Iterator[Record]:
+        reader = _Reader(chunks)
+
+        for key in reader.keys():
+            if key != "collections" or reader.peek() != "[":
+                reader.value()
+                continue
+
+            for position, _ in enumerate(reader.items()):
+                header = {}
+                links = None
+                for collection_key in reader.keys():
+                    if collection_key == "links" and reader.peek() == "[" and links is None:
+                        links = 0
+                        for _ in reader.items():
+                            item = json.dumps(reader.value())
+                            links += 1
+                            yield position, header, item, len(item)
+                    elif links is None:
+                        header[collection_key] = reader.value()
+                    else:
+                        # Keys after "links" can't be sent with the batches already uploaded
+                        reader.value()
+
+                if not links:
+                    # Empty collections are imported too
+                    yield position, header, None, 0
+
+
+    @staticmethod
+    def _render_linkwarden(groups: Dict[Any, Tuple[Any, List[str]]]) -> str:
+        collections = []
+        for header, items in groups.values():
+            encoded = json.dumps(header)
+            separator = "," if header else ""
+            collections.append(encoded[:-1] + separator + '"links":[' + ",".join(items) + "]}")
+        return '{"collections":[' + ",".join(collections) + "]}"
+
+
+    @staticmethod
+    def _wallabag_records(chunks: Iterable[bytes]) -> Iterator[Record]:
+        reader = _Reader(chunks)
+        for _ in reader.items():
+            item = json.dumps(reader.value())
+            yield None, None, item, len(item)
+
+
+    @staticmethod
+    def _render_wallabag(groups: Dict[Any, Tuple[Any, List[str]]]) -> str:
+        return "[" + ",".join(item for _, items in groups.values() for item in items) + "]"
+
+
+    @staticmethod
+    def _html_records(chunks: Iterable[bytes]) -> Iterator[Record]:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        parser = _BookmarksParser()
+
+        for chunk in chunks:
+            parser.feed(decoder.decode(chunk))
+            yield from parser.drain()
+
+        parser.feed(decoder.decode(b"", final=True))
+        parser.close()
+        yield from parser.drain()
+
+
+    @staticmethod
+    def _render_html(groups: Dict[Any, Tuple[Any, List[str]]]) -> str:
+        lines = [
+            "<!DOCTYPE NETSCAPE-Bookmark-file-1>",
+            '<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">',
+            "<TITLE>Bookmarks</TITLE>",
+            "<H1>Bookmarks</H1>",
+            "<DL><p>",
+        ]
+        current = ()
+        for path, items in groups.values():
+            # Only close and open the folders that differ from the previous group
+            common = 0
+            while common < min(len(current), len(path)) and current[common] == path[common]:
+                common += 1
+            lines.extend(["</DL><p>"] * (len(current) - common))
+            for folder in path[common:]:
+                lines.append(f"<DT><H3>{html.escape(folder, quote=False)}</H3>")
+                lines.append("<DL><p>")
+            lines.extend(items)
+            current = path
+        lines.extend(["</DL><p>"] * (len(current) + 1))
+        return "\n".join(lines)
+
+
+    @staticmethod
+    def _chunks(source: Union[str, BinaryIO], chunk_size: int) -> Iterator[bytes]:
+        if isinstance(source, str):
+            with open(source, "rb") as f:
+                yield from iter(lambda: f.read(chunk_size), b"")
+        else:
+            yield from iter(lambda: source.read(chunk_size), b"")
+
+
+    def _load_checkpoint(self, source: Union[str, BinaryIO], format: int) -> Dict[str, Any]:
+        """Load the checkpoint of a previous run of the same import, if any"""
+        identity = {
+            "source": os.path.abspath(source) if isinstance(source, str) else None,
+            "format": format,
+            "batch_size": self.batch_size,
+            "max_batch_bytes": self.max_batch_bytes,
+        }
+
+        if self.checkpoint and os.path.isfile(self.checkpoint):
+            with open(self.checkpoint) as f:
+                state = json.load(f)
+            if any(state.get(key) != value for key, value in identity.items()):
+                raise ValueError("The checkpoint belongs to another import (different file, format or batch size)")
+            state.setdefault("done", [])
+            state.setdefault("errors", {})
+            return state
+
+        return {**identity, "done": [], "errors": {}}
+
+
+    def _save_checkpoint(self, state: Dict[str, Any]):
+        """Atomically write the checkpoint to disk"""
+        if not self.checkpoint:
+            return
+        temp_path = self.checkpoint + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.checkpoint)
+
+
+class _BookmarksParser(HTMLParser):
+    """
+    Incremental parser of Netscape bookmark files
+
+    Each link is rendered back as a <DT><A> line (with its <DD> description) and queued
+    with the path of the folders containing it.
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.folders = []
+        self.folder_name = None
+        self.link = None
+        self.text = None
+        self.description = None
+        self.records = []
+
+
+    def drain(self) -> List[Record]:
+        records, self.records = self.records, []
+        return records
+
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("dt", "dl", "h3", "a"):
+            self._flush_link()
+
+        if tag == "h3":
+            self.text = []
+        elif tag == "dl":
+            self.folders.append(self.folder_name)
+            self.folder_name = None
+        elif tag == "a":
+            self.link = [attrs, None]
+            self.text = []
+        elif tag == "dd" and self.link is not None:
+            self.description = []
+
+
+    def handle_endtag(self, tag):
+        if tag == "h3" and self.text is not None:
+            self.folder_name = "".join(self.text).strip()
+            self.text = None
+        elif tag == "a" and self.link is not None and self.text is not None:
+            self.link[1] = "".join(self.text).strip()
+            self.text = None
+        elif tag == "dl":
+            self._flush_link()
+            if self.folders:
+                self.folders.pop()
+
+
+    def handle_data(self, data):
+        if self.text is not None:
+            self.text.append(data)
+        elif self.description is not None:
+            self.description.append(data)
+
+
+    def close(self):
+        super().close()
+        self._flush_link()
+
+
+    def _flush_link(self):
+        if self.link is None:
+            return
+
+        attrs, name = self.link
+        if self.text is not None:
+            name = "".join(self.text).strip()
+        self.link = None
+        self.text = None
+
+        rendered = "".join(f' {key.upper()}="{html.escape(value or "", quote=True)}"' for key, value in attrs)
+        item = f"<DT><A{rendered}>{html.escape(name or '', quote=False)}</A>"
+        if self.description is not None:
+            description = "".join(self.description).strip()
+            if description:
+                item += f"\n<DD>{html.escape(description, quote=False)}"
+            self.description = None
+
+        path = tuple(folder for folder in self.folders if folder is not None)
+        self.records.append((path, path, item, len(item)))
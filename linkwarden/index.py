@@ -0,0 +1,181 @@
+#! -- coding: utf-8 --
+
+import json
+import sqlite3
+import threading
+from typing import Dict, Any, Iterable, List, Optional
+
+# Fields matched by each searchBy* flag
+SEARCH_FIELDS = {
+    "name": "name",
+    "url": "url",
+    "description": "description",
+    "text_content": "text_content",
+    "tags": "tags",
+}
+
+
+class LocalIndex:
+    """
+    Local full-text index of links, backed by SQLite FTS5
+
+    It's kept up to date with the server by a SyncEngine (its index argument), which passes it
+    the new, edited and deleted links of each run, or filled from any list of link dictionaries
+    (add_links), then answers queries locally without any request. Matching follows the server search:
+    a link matches when the query is contained, case-insensitively, in any of the selected
+    fields (name, url, description, text content, tag names), like the searchBy* flags
+    of Public.get_links_from_collection.
+
+    Args:
+        path: Path of the SQLite database, ":memory:" for an in-memory index
+    """
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock, self._db:
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS links (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT, url TEXT, description TEXT, text_content TEXT, tags TEXT,
+                    collection_id INTEGER, pinned INTEGER, updated_at TEXT, data TEXT
+                );
+                CREATE INDEX IF NOT EXISTS links_collection ON links (collection_id);
+                CREATE VIRTUAL TABLE IF NOT EXISTS links_fts USING fts5(
+                    name, url, description, text_content, tags,
+                    content='links', content_rowid='id', tokenize='trigram'
+                );
+                CREATE TRIGGER IF NOT EXISTS links_ai AFTER INSERT ON links BEGIN
+                    INSERT INTO links_fts (rowid, name, url, description, text_content, tags)
+                    VALUES (new.id, new.name, new.url, new.description, new.text_content, new.tags);
+                END;
+                CREATE TRIGGER IF NOT EXISTS links_ad AFTER DELETE ON links BEGIN
+                    INSERT INTO links_fts (links_fts, rowid, name, url, description, text_content, tags)
+                    VALUES ('delete', old.id, old.name, old.url, old.description, old.text_content, old.tags);
+                END;
+            """)
+
+
+    def add_links(self, links: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert or replace links in the index
+
+        Args:
+            links: Iterable of link dictionaries, as returned by the API
+
+        Returns:
+            Number of links written
+        """
+        count = 0
+        with self._lock, self._db:
+            for link in links:
+                # Delete first so the FTS delete trigger sees the old values
+                self._db.execute("DELETE FROM links WHERE id = ?", (link["id"],))
+                self._db.execute("INSERT INTO links VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", self._row(link))
+                count += 1
+        return count
+
+
+    def remove_links(self, ids: Iterable[int]) -> int:
+        """
+        Remove links from the index
+
+        Returns:
+            Number of links removed
+        """
+        with self._lock, self._db:
+            return sum(self._db.execute("DELETE FROM links WHERE id = ?", (id,)).rowcount for id in ids)
+
+
+    def search(self,
+               query: str,
+               by_name: bool = True,
+               by_url: bool = True,
+               by_description: bool = True,
+               by_text_content: bool = False,
+               by_tags: bool = True,
+               collection_id: Optional[int] = None,
+               pinned_only: bool = False,
+               limit: Optional[int] = None
+               ) -> List[Dict[str, Any]]:
+        """
+        Search the index
+
+        Args:
+            query: Text to look for, matched case-insensitively as a substring
+            by_name, by_url, by_description, by_text_content, by_tags: Fields to search, like the searchBy* flags
+            collection_id: Only return links of this collection (optional)
+            pinned_only: Only return pinned links
+            limit: Maximum number of links to return (optional)
+
+        Returns:
+            List of link dictionaries, newest first
+        """
+        flags = {"name": by_name, "url": by_url, "description": by_description, "text_content": by_text_content, "tags": by_tags}
+        columns = [SEARCH_FIELDS[field] for field, enabled in flags.items() if enabled]
+
+        conditions = []
+        params = []
+
+        if query and columns:
+            if len(query) >= 3:
+                # The trigram tokenizer matches any substring of at least 3 characters
+                phrase = '"' + query.replace('"', '""') + '"'
+                conditions.append("links.id IN (SELECT rowid FROM links_fts WHERE links_fts MATCH ?)")
+                params.append("{" + " ".join(columns) + "} : " + phrase)
+            else:
+                pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                conditions.append("(" + " OR ".join(f"{column} LIKE ? ESCAPE '\\'" for column in columns) + ")")
+                params.extend([pattern] * len(columns))
+        elif query:
+            return []
+
+        if collection_id is not None:
+            conditions.append("collection_id = ?")
+            params.append(collection_id)
+
+        if pinned_only:
+            conditions.append("pinned = 1")
+
+        sql = "SELECT data FROM links"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            return [json.loads(row[0]) for row in self._db.execute(sql, params)]
+
+
+    def close(self):
+        self._db.close()
+
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM links").fetchone()[0]
+
+
+    @staticmethod
+    def _row(link: Dict[str, Any]) -> tuple:
+        """Columns of a link in the links table"""
+        tags = "\n".join(tag.get("name", "") for tag in link.get("tags") or [])
+        collection_id = link.get("collectionId")
+        if collection_id is None and isinstance(link.get("collection"), dict):
+            collection_id = link["collection"].get("id")
+
+        return (
+            link["id"],
+            link.get("name") or "",
+            link.get("url") or "",
+            link.get("description") or "",
+            link.get("textContent") or "",
+            tags,
+            collection_id,
+            1 if link.get("pinnedBy") else 0,
+            link.get("updatedAt"),
+            json.dumps(link)
+        )
@@ -0,0 +1,259 @@
+#! -- coding: utf-8 --
+"""
+Request instrumentation: hooks called around every request sent by a transport,
+and a built-in aggregator of latency percentiles per endpoint
+"""
+
+import json
+import math
+import random
+import re
+import threading
+import time
+from typing import Dict, Any, List, Mapping, Optional
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+_API_PREFIX = re.compile(r"^/api/v\d+")
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_template(url: str) -> str:
+    """
+    Endpoint of a URL with the numeric path segments replaced by {id}, so that all
+    the requests to the same endpoint are grouped: ".../api/v1/links/123" -> "/links/{id}"
+    """
+    path = url.split("://", 1)[-1]
+    path = "/" + path.split("/", 1)[1] if "/" in path else "/"
+    path = path.split("?", 1)[0].split("#", 1)[0]
+    return _ID_SEGMENT.sub("/{id}", _API_PREFIX.sub("", path)) or "/"
+
+
+class RequestEvent:
+    """
+    One attempt of a request, passed to the hooks
+
+    before_request receives it with the request fields set, after_request with the response fields
+    too. The timings are in seconds: connect is None when a pooled connection was reused, ttfb is the
+    time until the response headers arrived (including connect) and total includes reading the body,
+    except for streamed responses whose body is read later.
+
+    Attributes:
+        method: HTTP method
+        url: Full URL
+        endpoint: URL path template, e.g. "/links/{id}"
+        attempt: Number of the attempt, 0 for the first one, higher for retries
+        request_bytes: Size of the request body, None if unknown (streamed)
+        status_code: Status of the response, None if the request failed without a response
+        error: The exception raised, if any
+        connect, ttfb, total: Timings in seconds
+        response_bytes: Size of the response body, None if unknown (streamed without Content-Length)
+        started: time.time() when the request was sent
+        context: Free dictionary where hooks can keep their own data between before_request and after_request
+    """
+    __slots__ = ("method", "url", "endpoint", "attempt", "request_bytes", "status_code", "error",
+                 "connect", "ttfb", "total", "response_bytes", "started", "context")
+
+    def __init__(self, method: str, url: str, attempt: int = 0, request_bytes: Optional[int] = None):
+        self.method = method.upper()
+        self.url = url
+        self.endpoint = endpoint_template(url)
+        self.attempt = attempt
+        self.request_bytes = request_bytes
+        self.status_code = None
+        self.error = None
+        self.connect = None
+        self.ttfb = None
+        self.total = None
+        self.response_bytes = None
+        self.started = time.time()
+        self.context = {}
+
+
+    def __repr__(self):
+        return f"RequestEvent({self.method} {self.endpoint}, status={self.status_code}, total={self.total})"
+
+
+class RequestHook:
+    """
+    Base class of the instrumentation hooks, set on a transport with Transport(hooks=[...])
+
+    Hooks are called in the thread (or the event loop) sending the request, for every attempt.
+    Override one or both methods.
+    """
+    def before_request(self, event: RequestEvent):
+        """Called right before an attempt is sent"""
+
+
+    def after_request(self, event: RequestEvent):
+        """Called when an attempt got its response headers, or failed"""
+
+
+class LatencyStats(RequestHook):
+    """
+    In-process aggregator of the requests, per method and endpoint template
+
+    Keeps the count, the errors, the bytes and a uniform sample of the latencies of each
+    endpoint, and reports their percentiles. Thread safe.
+
+    Args:
+        max_samples: Maximum number of latencies kept per endpoint, older ones are replaced at random beyond it
+    """
+    def __init__(self, max_samples: int = 10000):
+        self.max_samples = max_samples
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+
+    def after_request(self, event: RequestEvent):
+        key = f"{event.method} {event.endpoint}"
+        with self._lock:
+            stats = self._endpoints.get(key)
+            if stats is None:
+                stats = self._endpoints[key] = {"count": 0, "errors": 0, "time": 0.0, "request_bytes": 0, "response_bytes": 0, "samples": [], "ttfb": []}
+
+            stats["count"] += 1
+            if event.error is not None or (event.status_code is not None and event.status_code >= 400):
+                stats["errors"] += 1
+            stats["request_bytes"] += event.request_bytes or 0
+            stats["response_bytes"] += event.response_bytes or 0
+
+            if event.total is not None:
+                stats["time"] += event.total
+                self._sample(stats["samples"], stats["count"], event.total)
+            if event.ttfb is not None:
+                self._sample(stats["ttfb"], stats["count"], event.ttfb)
+
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Statistics of each endpoint, the endpoints taking the most total time first
+
+        Returns:
+            Dictionary of "METHOD /endpoint" mapped to its "count", "errors", total "time",
+            "p50", "p95", "p99", "max" and "ttfb_p50" latencies in seconds, "request_bytes" and "response_bytes"
+        """
+        with self._lock:
+            endpoints = {key: dict(stats, samples=sorted(stats["samples"]), ttfb=sorted(stats["ttfb"])) for key, stats in self._endpoints.items()}
+
+        report = {}
+        for key, stats in sorted(endpoints.items(), key=lambda item: item[1]["time"], reverse=True):
+            samples = stats["samples"]
+            report[key] = {
+                "count": stats["count"],
+                "errors": stats["errors"],
+                "time": stats["time"],
+                "p50": _percentile(samples, 50),
+                "p95": _percentile(samples, 95),
+                "p99": _percentile(samples, 99),
+                "max": samples[-1] if samples else None,
+                "ttfb_p50": _percentile(stats["ttfb"], 50),
+                "request_bytes": stats["request_bytes"],
+                "response_bytes": stats["response_bytes"],
+            }
+        return report
+
+
+    def format_report(self) -> str:
+        """The report as a text table"""
+        lines = [f"{'endpoint':<40} {'count':>8} {'errors':>6} {'total s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'MB in':>8}"]
+        for key, stats in self.report().items():
+            lines.append(
+                f"{key:<40} {stats['count']:>8} {stats['errors']:>6} {stats['time']:>9.2f} "
+                f"{_ms(stats['p50']):>8} {_ms(stats['p95']):>8} {_ms(stats['p99']):>8} {stats['response_bytes'] / 1e6:>8.2f}"
+            )
+        return "\n".join(lines)
+
+
+    def reset(self):
+        """Drop all the statistics"""
+        with self._lock:
+            self._endpoints.clear()
+
+
+    def _sample(self, samples: List[float], count: int, value: float):
+        """Reservoir sampling, so the kept latencies stay a uniform sample of all of them"""
+        if len(samples) < self.max_samples:
+            samples.append(value)
+        else:
+            index = random.randrange(count)
+            if index < self.max_samples:
+                samples[index] = value
+
+
+def body_size(kwargs: Mapping[str, Any]) -> Optional[int]:
+    """Size of the body of a request from its keyword arguments, None if it's streamed"""
+    for name in ("data", "content"):
+        body = kwargs.get(name)
+        if body is None:
+            continue
+        if isinstance(body, str):
+            return len(body.encode())
+        if isinstance(body, (bytes, bytearray)):
+            return len(body)
+        if isinstance(body, Mapping):
+            return len("&".join(f"{key}={value}" for key, value in body.items()).encode())
+        length = getattr(body, "len", None)
+        return length if isinstance(length, int) else None
+
+    if kwargs.get("json") is not None:
+        # Same encoding as requests, the size may differ slightly from what httpx sends
+        return len(json.dumps(kwargs["json"]).encode())
+
+    return 0
+
+
+def _percentile(samples: List[float], percent: float) -> Optional[float]:
+    """Nearest-rank percentile of sorted samples"""
+    if not samples:
+        return None
+    rank = math.ceil(percent / 100 * len(samples))
+    return samples[max(0, min(len(samples), rank) - 1)]
+
+
+def _ms(seconds: Optional[float]) -> str:
+    return "-" if seconds is None else f"{seconds * 1000:.1f}"
+
+
+# Time spent opening a connection in the current thread, set by the timed connections
+_connect_timing = threading.local()
+
+
+def reset_connect_time():
+    _connect_timing.value = None
+
+
+def last_connect_time() -> Optional[float]:
+    """Seconds spent opening a connection (TCP + TLS) since reset_connect_time, None if a pooled one was reused"""
+    return getattr(_connect_timing, "value", None)
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        _connect_timing.value = time.perf_counter() - started
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        _connect_timing.value = time.perf_counter() - started
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections record how long they took to open, for RequestEvent.connect"""
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPConnectionPool, "https": _TimedHTTPSConnectionPool}
@@ -0,0 +1,182 @@
+#! -- coding: utf-8 --
+
+import codecs
+import json
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Tuple, Union
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """
+    Pull parser over a stream of JSON text
+
+    Only the structure the caller walks (objects and arrays it descends into) is parsed piece by piece,
+    any other value is decoded whole by the json module, so memory is bounded by the largest such value.
+    """
+    def __init__(self, chunks: Iterable[Union[bytes, str]]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer, False at the end of the stream"""
+        if self.eof:
+            return False
+
+        for chunk in self._chunks:
+            if isinstance(chunk, bytes):
+                chunk = self._utf8.decode(chunk)
+            if chunk:
+                break
+        else:
+            chunk = self._utf8.decode(b"", final=True)
+            self.eof = True
+
+        # Drop the consumed part so the buffer doesn't grow with the stream
+        if self.pos > len(self.buf) // 2:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        self.buf += chunk
+        return bool(chunk)
+
+
+    def peek(self) -> str:
+        """Next non-whitespace character, "" at the end of the stream"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Invalid JSON: expected {' or '.join(repr(c) for c in chars)} at offset {self.pos}, got {char!r}")
+        self.pos += 1
+        return char
+
+
+    def value(self) -> Any:
+        """Decode the next whole value"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            else:
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+
+            # Read at least as much as already buffered, so a large value isn't re-decoded once per chunk
+            target = 2 * (len(self.buf) - self.pos)
+            while self._fill() and len(self.buf) - self.pos < target:
+                pass
+
+
+    def keys(self) -> Iterator[str]:
+        """
+        Iterate over the keys of the next object
+
+        The caller must consume the value of each key (with value(), keys() or items())
+        before asking for the next one.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise ValueError(f"Invalid JSON: object key expected at offset {self.pos}")
+            self.expect(":")
+            yield key
+            if self.expect(",}") == "}":
+                return
+
+
+    def items(self) -> Iterator[None]:
+        """Iterate over the elements of the next array, the caller must consume each element"""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+
+        while True:
+            yield None
+            if self.expect(",]") == "]":
+                return
+
+
+def _chunks_of(source: Union[str, BinaryIO, Iterable[bytes]], chunk_size: int) -> Iterable[Union[bytes, str]]:
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            yield from iter(lambda: f.read(chunk_size), b"")
+    elif hasattr(source, "read"):
+        yield from iter(lambda: source.read(chunk_size), source.read(0))
+    else:
+        yield from source
+
+
+def iter_export(source: Union[str, BinaryIO, Iterable[bytes]], chunk_size: int = 64 * 1024) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Parse a Linkwarden JSON export incrementally
+
+    The export is a user object with a "collections" array, each collection having a "links" array.
+    Links are yielded one at a time as soon as they're parsed, so exports far bigger than the memory
+    can be processed. Each collection is yielded after its links, without the "links" key, and the
+    user last, without the "collections" key.
+
+    Args:
+        source: Path of the export file, a file object opened in binary mode, or an iterable of bytes chunks
+            (e.g. response.iter_content())
+        chunk_size: Size of the chunks read from a path or a file object
+
+    Yields:
+        ("link", link), ("collection", collection) and ("user", user) tuples. Links have a "collectionId"
+
+    Raises:
+        ValueError: If the export isn't valid JSON
+    """
+    reader = _Reader(_chunks_of(source, chunk_size))
+    user = {}
+
+    for key in reader.keys():
+        if key == "collections" and reader.peek() == "[":
+            for _ in reader.items():
+                yield from _iter_collection(reader)
+        else:
+            user[key] = reader.value()
+
+    if reader.peek():
+        raise ValueError(f"Invalid JSON: extra data at offset {reader.pos}")
+
+    yield "user", user
+
+
+def _iter_collection(reader: _Reader) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    collection = {}
+
+    for key in reader.keys():
+        if key == "links" and reader.peek() == "[":
+            for _ in reader.items():
+                link = reader.value()
+                if isinstance(link, dict) and "collectionId" not in link and "id" in collection:
+                    link["collectionId"] = collection["id"]
+                yield "link", link
+        else:
+            collection[key] = reader.value()
+
+    yield "collection", collection
@@ -1,24 +1,33 @@
 #! -- coding: utf-8 --
 
-from .base import Base
-from typing import Dict, Any, Optional, List
+from .base import Base, APIError
+from .transport import Transport
+from .concurrency import bounded_map, chunked, BulkResult
+from .pagination import iter_items
+from .models import Link, to_models
+from typing import Dict, Any, Optional, List, Iterable, Iterator, Callable, Tuple
+
+# Errors that an item of a chunk can cause, the only ones worth splitting the chunk for.
+# Anything else (auth, rate limit, 5xx, network errors) fails the whole chunk at once
+BISECTABLE_STATUSES = (400, 404, 409, 413, 422)
 
 class Links(Base):
     """
     Class for managing links
     """
 
-    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1"):
-        super().__init__(api_key, base_url, api_version)
+    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1", transport: Optional[Transport]=None):
+        super().__init__(api_key, base_url, api_version, transport)
         self.links_endpoint = "/links"
 
 
-    def get_link(self, id: int) -> Dict[str, Any]:
+    def get_link(self, id: int, as_model: bool = False) -> Dict[str, Any]:
         """
         Get a link by ID
 
         Args:
             id: The ID of the link to get
+            as_model: Return a Link model instead of a dictionary
 
         Returns:
             Link dictionary
@@ -26,7 +35,44 @@ class Links(Base):
         Raises:
             APIError: If the API request fails
         """
-        return self._make_request("GET", f"{self.links_endpoint}/{id}")
+        result = self._make_request("GET", f"{self.links_endpoint}/{id}")
+        return self._then(result, lambda link: to_models(link, Link)) if as_model else result
+
+
+    def get_links_by_ids(self, ids: Iterable[int], max_workers: int = 8, as_model: bool = False) -> List[BulkResult]:
+        """
+        Get many links by ID, concurrently
+
+        Repeated IDs are requested only once, and the IDs fresh in the response cache of the
+        transport (if any, sync client only) are served from it. A failed ID (e.g. a deleted link) doesn't stop the others.
+
+        Args:
+            ids: Iterable of link IDs
+            max_workers: Maximum number of concurrent requests
+            as_model: Return Link models instead of dictionaries
+
+        Returns:
+            List of BulkResult in input order, with the ID as item and the link as result, or the error
+        """
+        return self._get_by_ids(lambda id: self.get_link(id, as_model), ids, max_workers)
+
+
+    def iter_links_by_ids(self, ids: Iterable[int], max_workers: int = 8, ordered: bool = False, as_model: bool = False) -> Iterator[BulkResult]:
+        """
+        Same as get_links_by_ids, but yields the results as they arrive
+
+        The IDs are consumed lazily, so they can come from a generator over millions of them.
+
+        Args:
+            ids: Iterable of link IDs
+            max_workers: Maximum number of concurrent requests
+            ordered: Whether to yield the results in input order, otherwise as soon as they complete
+            as_model: Return Link models instead of dictionaries
+
+        Yields:
+            One BulkResult per distinct ID, its index is the position of the first occurrence of the ID in the input
+        """
+        return self._iter_by_ids(lambda id: self.get_link(id, as_model), ids, max_workers, ordered)
 
     
     def get_links(self) -> List[Dict[str, Any]]:
@@ -195,4 +241,148 @@ class Links(Base):
                 "tags": new_tags
             }
         }
-        return self._make_request("PUT", self.links_endpoint, json=payload)
\ No newline at end of file
+        return self._make_request("PUT", self.links_endpoint, json=payload)
+
+
+    def create_links_bulk(self,
+                          links: Iterable[Dict[str, Any]],
+                          max_workers: int = 8,
+                          dedupe: bool = False,
+                          existing_urls: Optional[Iterable[str]] = None
+                          ) -> List[BulkResult]:
+        """
+        Create many links concurrently
+
+        The input is consumed lazily and at most 2 * max_workers creations are in flight,
+        so it can be a generator over millions of bookmarks. A failed creation doesn't stop the others.
+
+        Args:
+            links: Iterable of dictionaries with the arguments of create_link (name, url, type, description, tags, collection)
+            max_workers: Maximum number of concurrent requests
+            dedupe: Whether to skip the links whose URL is already in the account or earlier in the input
+            existing_urls: URLs already in the account, used when dedupe is True.
+                If not given, they're fetched by walking the search endpoint once before starting
+
+        Returns:
+            List of BulkResult in input order, with the created link as result, the error,
+            or skipped=True for the duplicates
+        """
+        seen = None
+        if dedupe:
+            seen = set(existing_urls) if existing_urls is not None else {link.get("url") for link in self._iter_all_links()}
+
+        def mark_duplicates():
+            for link in links:
+                url = link.get("url")
+                duplicate = seen is not None and url is not None and url in seen
+                if seen is not None and url is not None:
+                    seen.add(url)
+                yield link, duplicate
+
+        def create(entry):
+            link, duplicate = entry
+            if duplicate:
+                return None
+            return self.create_link(**link)
+
+        results = []
+        for outcome in bounded_map(create, mark_duplicates(), max_workers=max_workers):
+            link, duplicate = outcome.item
+            results.append(BulkResult(outcome.index, link, outcome.result, outcome.error, skipped=duplicate))
+        return results
+
+
+    def delete_links_bulk(self,
+                          ids: Iterable[int],
+                          chunk_size: int = 500,
+                          max_workers: int = 4
+                          ) -> Dict[str, Any]:
+        """
+        Delete any number of links, in concurrent chunks
+
+        The IDs are consumed lazily and sent in chunks of chunk_size with delete_link_list.
+        When a chunk is rejected because of its content (400, 404, 409, 413 or 422), it's split in halves
+        and retried, down to single IDs, so the IDs causing the failure are isolated and all the others are deleted.
+        Any other error (e.g. 5xx or network errors) fails the whole chunk, retries are left to the retry policy.
+
+        Args:
+            ids: Iterable of link IDs
+            chunk_size: Number of IDs per request
+            max_workers: Maximum number of concurrent requests
+
+        Returns:
+            Dictionary with the number of "deleted" IDs and the "failed" ones, mapped to their error
+        """
+        deleted, failed = self._run_chunks(self.delete_link_list, ids, chunk_size, max_workers)
+        return {"deleted": deleted, "failed": {id: error for id, error in failed}}
+
+
+    def update_links_bulk(self,
+                          links: Iterable[Dict[str, Any]],
+                          collection_id: int,
+                          remove_previous_tags: bool = False,
+                          new_tags: list[Dict[str, Any]] = None,
+                          chunk_size: int = 200,
+                          max_workers: int = 4
+                          ) -> Dict[str, Any]:
+        """
+        Bulk update any number of links, in concurrent chunks
+
+        Same as bulk_update_links, but the links are consumed lazily and sent in chunks of chunk_size.
+        When a chunk is rejected because of its content (400, 404, 409, 413 or 422), it's split in halves
+        and retried, down to single links, so the links causing the failure are isolated and all the others are updated.
+        Any other error (e.g. 5xx or network errors) fails the whole chunk, retries are left to the retry policy.
+
+        Args:
+            links: Iterable of link objects
+            collection_id: The ID of the collection to update
+            remove_previous_tags: Whether to remove previous tags
+            new_tags: List of tag objects
+            chunk_size: Number of links per request
+            max_workers: Maximum number of concurrent requests
+
+        Returns:
+            Dictionary with the number of "updated" links and the "failed" ones, as link ID mapped to the error
+        """
+        def update(chunk):
+            return self.bulk_update_links(chunk, collection_id, remove_previous_tags, new_tags)
+
+        updated, failed = self._run_chunks(update, links, chunk_size, max_workers)
+        return {"updated": updated, "failed": {link.get("id"): error for link, error in failed}}
+
+
+    def _run_chunks(self, send: Callable[[list], Any], items: Iterable[Any], chunk_size: int, max_workers: int) -> Tuple[int, List[Tuple[Any, APIError]]]:
+        """Send the items in concurrent chunks, bisecting the failed ones. Returns (number of succeeded items, failed items with their error)"""
+        succeeded = 0
+        failed = []
+        for outcome in bounded_map(lambda chunk: _send_bisecting(send, chunk), chunked(items, chunk_size), max_workers=max_workers, ordered=False):
+            if not outcome.ok:
+                raise outcome.error
+            succeeded += outcome.result[0]
+            failed.extend(outcome.result[1])
+        return succeeded, failed
+
+
+    def _iter_all_links(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over all the links of the user through the paginated search endpoint"""
+        return iter_items(lambda cursor: self._make_request("GET", "/search", params={"searchQueryString": "", "cursor": cursor or 0}), read_ahead=1)
+
+
+def _send_bisecting(send: Callable[[list], Any], chunk: list) -> Tuple[int, List[Tuple[Any, APIError]]]:
+    """
+    Send a chunk, and if the server rejects its content send each half of it, recursively
+
+    Returns:
+        Tuple of (number of succeeded items, failed items with their error)
+    """
+    try:
+        send(chunk)
+        return len(chunk), []
+    except APIError as e:
+        if len(chunk) == 1 or e.status_code not in BISECTABLE_STATUSES:
+            return 0, [(item, e) for item in chunk]
+
+    middle = len(chunk) // 2
+    left = _send_bisecting(send, chunk[:middle])
+    right = _send_bisecting(send, chunk[middle:])
+    return left[0] + right[0], left[1] + right[1]
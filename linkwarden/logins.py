@@ -1,7 +1,8 @@
 #! -- coding: utf-8 --
 
 from .base import Base
-from typing import Dict, Any
+from .transport import Transport
+from typing import Dict, Any, Optional
 
 class Logins(Base):
     """
@@ -11,8 +12,8 @@ class Logins(Base):
     I'm lazy and don't want to create a new class for this =)
     If needed, it can safely be initialized with an empty string for the API key
     """
-    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1"):
-        super().__init__(api_key, base_url, api_version)
+    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1", transport: Optional[Transport]=None):
+        super().__init__(api_key, base_url, api_version, transport)
         self.logins_endpoint = "/logins"
 
     def get_login_configuration(self) -> Dict[str, Any]:
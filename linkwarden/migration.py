@@ -1,15 +1,22 @@
 #! -- coding: utf-8 --
 
-from .base import Base
-from typing import Dict, Any
+import os
+import requests
+from .base import Base, APIError
+from .transport import Transport
+from .archives import _ArchiveDownload
+from .jsonstream import iter_export
+from typing import Dict, Any, BinaryIO, Callable, Iterator, Optional, Tuple, Union
+
+IMPORT_FORMATS = {0: "linkwarden", 1: "html", 2: "wallabag"}
 
 class Migration(Base):
     """
     Class for managing migrations
     """
 
-    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1"):
-        super().__init__(api_key, base_url, api_version)
+    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1", transport: Optional[Transport]=None):
+        super().__init__(api_key, base_url, api_version, transport)
         self.migration_endpoint = "/migration"
 
 
@@ -26,19 +33,93 @@ class Migration(Base):
         return self._make_request("GET", self.migration_endpoint)
 
 
-    def import_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def export_to_file(self,
+                       destination: Union[str, os.PathLike, BinaryIO],
+                       chunk_size: int = 1024 * 1024,
+                       progress: Optional[Callable[[int, Optional[int]], None]] = None
+                       ) -> Dict[str, Any]:
+        """
+        Stream the migration data to disk, without loading it in memory
+
+        Args:
+            destination: Path of the file to write (str or os.PathLike), or a writable binary file object.
+                A path is written to "<path>.part" first and renamed once complete
+            chunk_size: Size of the chunks read from the network
+            progress: Called after each chunk with (bytes written so far, total size or None)
+
+        Returns:
+            Dictionary with the number of bytes written ("size") and the "content_type"
+
+        Raises:
+            APIError: If the API request fails
+        """
+        if isinstance(destination, os.PathLike):
+            destination = os.fspath(destination)
+        target = destination + ".part" if isinstance(destination, str) else destination
+        download = _ArchiveDownload(target, None, False, progress, None)
+
+        with self._stream_request("GET", self.migration_endpoint) as response:
+            download.start(response.status_code, response.headers)
+            try:
+                for chunk in response.iter_content(chunk_size):
+                    download.write(chunk)
+            except requests.exceptions.RequestException as e:
+                raise APIError(f"Network error: {e}")
+            finally:
+                download.close()
+
+        if isinstance(destination, str):
+            os.replace(target, destination)
+
+        result = download.result()
+        return {"size": result["size"], "content_type": result["content_type"]}
+
+
+    def iter_export_data(self, chunk_size: int = 64 * 1024) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Fetch the migration data and parse it while it's downloaded
+
+        Links are yielded one at a time, so the whole export is never held in memory.
+        See jsonstream.iter_export for the order of the items.
+
+        Args:
+            chunk_size: Size of the chunks read from the network
+
+        Yields:
+            ("link", link), ("collection", collection) and ("user", user) tuples
+
+        Raises:
+            APIError: If the API request fails
+            ValueError: If the export isn't valid JSON
+        """
+        with self._stream_request("GET", self.migration_endpoint) as response:
+            try:
+                yield from iter_export(response.iter_content(chunk_size))
+            except requests.exceptions.RequestException as e:
+                raise APIError(f"Network error: {e}")
+
+
+    def import_data(self, data: Union[str, Dict[str, Any]], format: int = 0) -> Dict[str, Any]:
         """
         Imports migration data, including user information, collections, and links.
-        For now it only supports the LinkWarden JSON format.
+        For large files use MigrationImporter, which streams them in batches.
 
         Args:
-            data: Json Migration data
+            data: Content of the file to import: Json Migration data, or the text of a Netscape bookmarks HTML file
+            format: Format of the data (0 = LinkWarden JSON, 1 = HTML, 2 = Wallabag JSON)
 
         Returns:
             Respone message from the server
+
+        Raises:
+            APIError: If the API request fails
+            ValueError: If the format is invalid
         """
+        if format not in IMPORT_FORMATS:
+            raise ValueError("Invalid format. Valid formats are: 0 = LinkWarden JSON, 1 = HTML, 2 = Wallabag JSON")
+
         payload = {
-            "format": 0, # 0 = LinkWarden JSON, 1 = HTML, 2 = Wallabag JSON
+            "format": format,
             "data": data
         }
-        return self._make_request("POST", self.migration_endpoint, json=payload)
\ No newline at end of file
+        return self._make_request("POST", self.migration_endpoint, json=payload)
@@ -0,0 +1,323 @@
+#! -- coding: utf-8 --
+"""
+Compact model objects for links, collections, tags and users
+
+The resources return plain dictionaries by default. With as_model=True they return these
+objects instead: the known fields are stored in __slots__ instead of a per-object dict,
+nested objects (the collection and the tags of a link...) are only turned into models when
+they're accessed, and repeated nested objects are shared through an Interner, so a million
+links in ten collections only hold ten collection objects.
+
+Models still behave like the dictionaries they come from for reading: link["url"],
+link.get("collectionId") and to_dict() use the API field names.
+"""
+
+import re
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Type, TypeVar
+
+M = TypeVar("M", bound="Model")
+
+
+def _snake_case(name: str) -> str:
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+
+
+class Interner:
+    """
+    Table of shared nested objects
+
+    Nested dictionaries with the same type, ID, updatedAt and keys are replaced by the first one seen,
+    and decoded to a single model. Use one Interner for all the models of a batch (e.g. a whole
+    search) to deduplicate across them.
+    """
+    def __init__(self):
+        self._raw = {}
+        self._models = {}
+
+
+    def raw(self, cls: Type["Model"], data: Any) -> Any:
+        """Shared copy of a nested dictionary (or list of dictionaries)"""
+        if isinstance(data, list):
+            return [self.raw(cls, item) for item in data]
+        key = self._key(cls, data)
+        if key is None:
+            return data
+        return self._raw.setdefault(key, data)
+
+
+    def model(self, cls: Type[M], data: Any) -> Any:
+        """Shared model of a nested dictionary (or list of models)"""
+        if isinstance(data, list):
+            return [self.model(cls, item) for item in data]
+        if not isinstance(data, dict):
+            return data
+        key = self._key(cls, data)
+        if key is None:
+            return cls.from_dict(data, self)
+        model = self._models.get(key)
+        if model is None:
+            model = self._models[key] = cls.from_dict(data, self)
+        return model
+
+
+    def __len__(self):
+        return len(self._raw) + len(self._models)
+
+
+    @staticmethod
+    def _key(cls: Type["Model"], data: Any) -> Optional[Tuple]:
+        if not isinstance(data, dict) or "id" not in data:
+            return None
+        return (cls, data["id"], data.get("updatedAt"), tuple(data))
+
+
+class Model:
+    """
+    Base class of the models
+
+    Subclasses list the API fields stored as attributes in _fields (camelCase API name, the attribute
+    is its snake_case version) and the nested fields decoded lazily in _nested (API name mapped to
+    the name of the model class). Any other field is kept in an extra dictionary.
+    The fields present in the API dictionary are recorded in a bitmask, so a field sent as null
+    is still "in" the model and kept by to_dict, like in the dictionary.
+    """
+    __slots__ = ("_extra", "_interner", "_present")
+
+    _fields: Tuple[str, ...] = ()
+    _nested: Dict[str, str] = {}
+    _attributes: Dict[str, str] = {}
+    _bits: Dict[str, int] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._attributes = {field: _snake_case(field) for field in cls._fields}
+        for field in cls._nested:
+            cls._attributes[field] = "_" + _snake_case(field)
+        cls._bits = {field: 1 << index for index, field in enumerate(cls._attributes)}
+
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None, interner: Optional[Interner] = None):
+        """
+        Build a model from an API dictionary
+
+        Args:
+            data: The dictionary returned by the API
+            interner: Interner shared by the models of a batch (optional)
+        """
+        self._interner = interner
+        attributes = self._attributes
+        nested = self._nested
+        bits = self._bits
+        extra = None
+        present = 0
+
+        for attribute in attributes.values():
+            object.__setattr__(self, attribute, None)
+
+        for key, value in (data or {}).items():
+            attribute = attributes.get(key)
+            if attribute is None:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+            elif key in nested and interner is not None:
+                object.__setattr__(self, attribute, interner.raw(_model_class(nested[key]), value))
+                present |= bits[key]
+            else:
+                object.__setattr__(self, attribute, value)
+                present |= bits[key]
+
+        self._extra = extra
+        self._present = present
+
+
+    @classmethod
+    def from_dict(cls: Type[M], data: Dict[str, Any], interner: Optional[Interner] = None) -> M:
+        """Build a model from an API dictionary, same as the constructor"""
+        return cls(data, interner)
+
+
+    @classmethod
+    def from_list(cls: Type[M], items: Iterable[Dict[str, Any]], interner: Optional[Interner] = None) -> List[M]:
+        """Build the models of a list of API dictionaries, sharing their nested objects"""
+        interner = interner if interner is not None else Interner()
+        return [cls.from_dict(item, interner) for item in items]
+
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The API dictionary of the model, a copy that doesn't share any container with the model"""
+        data = {}
+        for key, attribute in self._attributes.items():
+            value = object.__getattribute__(self, attribute)
+            if value is not None or self._present & self._bits[key]:
+                data[key] = _to_plain(value)
+        if self._extra:
+            data.update(_to_plain(self._extra))
+        return data
+
+
+    def _decode(self, field: str) -> Any:
+        """Value of a nested field, decoded to models on first access"""
+        attribute = self._attributes[field]
+        value = object.__getattribute__(self, attribute)
+        if isinstance(value, dict) or (isinstance(value, list) and value and isinstance(value[0], dict)):
+            interner = self._interner if self._interner is not None else Interner()
+            value = interner.model(_model_class(self._nested[field]), value)
+            object.__setattr__(self, attribute, value)
+        return value
+
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._nested:
+            return self._decode(key)
+        if key in self._attributes:
+            return object.__getattribute__(self, self._attributes[key])
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Read a field by its API name, like dict.get"""
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return value if value is not None else default
+
+
+    def __contains__(self, key: str) -> bool:
+        attribute = self._attributes.get(key)
+        if attribute is not None:
+            return bool(self._present & self._bits[key]) or object.__getattribute__(self, attribute) is not None
+        return bool(self._extra) and key in self._extra
+
+
+    def __eq__(self, other):
+        if type(self) is not type(other):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+
+    def __hash__(self):
+        return hash((type(self), getattr(self, "id", None), getattr(self, "updated_at", None)))
+
+
+    def __repr__(self):
+        name = getattr(self, "name", None)
+        return f"{type(self).__name__}(id={getattr(self, 'id', None)!r}" + (f", name={name!r})" if name is not None else ")")
+
+
+def to_models(result: Any, cls: Type[M], interner: Optional[Interner] = None) -> Any:
+    """
+    Convert a decoded response to models
+
+    A dictionary becomes a model, a list a list of models. In a paginated response
+    ({"data": {"links": [...]}}) only the links are converted, in a copy of the page.
+    The result is never modified, since it can be the object stored by the response cache.
+
+    Args:
+        result: The decoded response
+        cls: The model class
+        interner: Interner shared with other responses (optional)
+    """
+    interner = interner if interner is not None else Interner()
+
+    if isinstance(result, list):
+        return cls.from_list(result, interner)
+
+    if isinstance(result, dict):
+        data = result.get("data", result)
+        if isinstance(data, dict) and isinstance(data.get("links"), list):
+            data = {**data, "links": Link.from_list(data["links"], interner)}
+            return {**result, "data": data} if "data" in result else data
+        return cls(result, interner)
+
+    return result
+
+
+def _model_class(name: str) -> Type[Model]:
+    return globals()[name]
+
+
+def _to_plain(value: Any) -> Any:
+    """Plain copy of a value, the containers are copied since they can be shared through an Interner"""
+    if isinstance(value, Model):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_to_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _to_plain(item) for key, item in value.items()}
+    return value
+
+
+class User(Model):
+    """A user, as returned by the users endpoints or nested in other objects"""
+    __slots__ = ("id", "name", "username", "email", "image", "locale", "is_private", "created_at", "updated_at")
+
+    _fields = ("id", "name", "username", "email", "image", "locale", "isPrivate", "createdAt", "updatedAt")
+
+
+class Tag(Model):
+    """A tag"""
+    __slots__ = ("id", "name", "owner_id", "created_at", "updated_at")
+
+    _fields = ("id", "name", "ownerId", "createdAt", "updatedAt")
+
+    @property
+    def link_count(self) -> Optional[int]:
+        """Number of links of the tag, when the server includes it"""
+        return (self.get("_count") or {}).get("links")
+
+
+class Collection(Model):
+    """A collection"""
+    __slots__ = ("id", "name", "description", "icon", "icon_weight", "color", "parent_id", "is_public",
+                 "owner_id", "created_by_id", "created_at", "updated_at", "_parent")
+
+    _fields = ("id", "name", "description", "icon", "iconWeight", "color", "parentId", "isPublic",
+               "ownerId", "createdById", "createdAt", "updatedAt")
+    _nested = {"parent": "Collection"}
+
+    @property
+    def parent(self) -> Optional["Collection"]:
+        """The parent collection, when the server includes it"""
+        return self._decode("parent")
+
+    @property
+    def link_count(self) -> Optional[int]:
+        """Number of links of the collection, when the server includes it"""
+        return (self.get("_count") or {}).get("links")
+
+
+class Link(Model):
+    """A link"""
+    __slots__ = ("id", "name", "type", "description", "url", "text_content", "preview", "image", "pdf",
+                 "readable", "monolith", "last_preserved", "import_date", "collection_id", "created_by_id",
+                 "created_at", "updated_at", "_collection", "_tags", "_pinned_by")
+
+    _fields = ("id", "name", "type", "description", "url", "textContent", "preview", "image", "pdf",
+               "readable", "monolith", "lastPreserved", "importDate", "collectionId", "createdById",
+               "createdAt", "updatedAt")
+    _nested = {"collection": "Collection", "tags": "Tag", "pinnedBy": "User"}
+
+    @property
+    def collection(self) -> Optional[Collection]:
+        """The collection of the link"""
+        return self._decode("collection")
+
+    @property
+    def tags(self) -> List[Tag]:
+        """The tags of the link"""
+        return self._decode("tags") or []
+
+    @property
+    def pinned_by(self) -> List[User]:
+        """The users who pinned the link"""
+        return self._decode("pinnedBy") or []
+
+    @property
+    def pinned(self) -> bool:
+        """Whether the link is pinned by the current user"""
+        return bool(object.__getattribute__(self, "_pinned_by"))
+
@@ -0,0 +1,185 @@
+#! -- coding: utf-8 --
+
+import mmap
+import os
+import uuid
+from typing import AsyncIterator, BinaryIO, Callable, Dict, Iterator, Optional, Union
+
+class MultipartEncoder:
+    """
+    Streaming multipart/form-data body with a single file field
+
+    The body is produced on the fly while it's sent: the file is read chunk by chunk
+    (or sliced from a memory map), so uploading a file never loads it in memory.
+    Pass it as data= together with its headers:
+
+        encoder = MultipartEncoder("file", "doc.pdf", "/path/to/doc.pdf")
+        requests.post(url, data=encoder, headers=encoder.headers)
+
+    Args:
+        field_name: Name of the form field
+        filename: File name sent to the server
+        source: Path of the file, or a binary file object positioned at the start of the data
+        content_type: Content type of the file part
+        chunk_size: Size of the chunks read from the file when iterating
+        use_mmap: Memory-map the file instead of reading it (only when source is a path)
+        progress: Called after each chunk with (bytes of the body sent so far, total size of the body or None)
+    """
+    def __init__(self,
+                 field_name: str,
+                 filename: str,
+                 source: Union[str, BinaryIO],
+                 content_type: str = "application/octet-stream",
+                 chunk_size: int = 1024 * 1024,
+                 use_mmap: bool = False,
+                 progress: Optional[Callable[[int, Optional[int]], None]] = None
+                 ):
+        self.boundary = uuid.uuid4().hex
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.sent = 0
+
+        safe_filename = filename.replace('"', '%22').replace('\r', '').replace('\n', '')
+        self._head = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field_name}"; filename="{safe_filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode()
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode()
+
+        self._owned = isinstance(source, (str, os.PathLike))
+        self._file = open(source, "rb") if self._owned else source
+        self._map = None
+        self._file_size = self._remaining_size(self._file)
+
+        if use_mmap and self._owned and self._file_size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._position = 0
+        self._buffer = b""
+
+
+    @property
+    def content_type(self) -> str:
+        """Content-Type header of the body"""
+        return f"multipart/form-data; boundary={self.boundary}"
+
+
+    @property
+    def len(self) -> int:
+        """
+        Total size of the body
+
+        Raises:
+            AttributeError: If the size of the file can't be known, so the body has to be sent chunked
+        """
+        if self._file_size is None:
+            raise AttributeError("len")
+        return len(self._head) + self._file_size + len(self._tail)
+
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """Headers to send with the body"""
+        headers = {"Content-Type": self.content_type}
+        if self._file_size is not None:
+            headers["Content-Length"] = str(self.len)
+        return headers
+
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Read the next bytes of the body
+
+        Args:
+            size: Maximum number of bytes to return, -1 for the whole remaining body
+
+        Returns:
+            The bytes, empty at the end of the body
+        """
+        if size is None or size < 0:
+            return b"".join(iter(lambda: self.read(self.chunk_size), b""))
+
+        while len(self._buffer) < size:
+            part = self._next_part(size - len(self._buffer))
+            if not part:
+                break
+            self._buffer += part
+
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+
+        if data:
+            self.sent += len(data)
+            if self.progress:
+                self.progress(self.sent, self._total())
+        else:
+            self.close()
+
+        return data
+
+
+    def __iter__(self) -> Iterator[bytes]:
+        return iter(lambda: self.read(self.chunk_size), b"")
+
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for chunk in self:
+            yield chunk
+
+
+    def close(self):
+        """Release the memory map and close the file if it was opened here"""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._owned and not self._file.closed:
+            self._file.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args):
+        self.close()
+
+
+    def _next_part(self, size: int) -> bytes:
+        """Next piece of the body: head, then the file, then the tail"""
+        if self._position == 0:
+            self._position = 1
+            return self._head
+
+        if self._position == 1:
+            source = self._map if self._map is not None else self._file
+            data = source.read(size)
+            if data:
+                return data
+            self._position = 2
+
+        if self._position == 2:
+            self._position = 3
+            return self._tail
+
+        return b""
+
+
+    def _total(self) -> Optional[int]:
+        return self.len if self._file_size is not None else None
+
+
+    @staticmethod
+    def _remaining_size(file_object: BinaryIO) -> Optional[int]:
+        """Bytes left to read in the file, None if it can't be known (e.g. a pipe)"""
+        try:
+            return os.fstat(file_object.fileno()).st_size - file_object.tell()
+        except (AttributeError, OSError, ValueError):
+            pass
+
+        try:
+            position = file_object.tell()
+            end = file_object.seek(0, os.SEEK_END)
+            file_object.seek(position)
+            return end - position
+        except (AttributeError, OSError, ValueError):
+            return None
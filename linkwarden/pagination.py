@@ -0,0 +1,158 @@
+#! -- coding: utf-8 --
+"""
+Helpers to walk the cursor based endpoints (search, public collection links) page by page
+"""
+
+import queue
+import threading
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, Iterator, List, Optional, Tuple
+
+
+def split_page(result: Any) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """
+    Extract the links and the next cursor from a paginated response
+
+    The API returns either {"data": {"links": [...], "nextCursor": ...}}, the same
+    object without the "data" wrapper, or a plain list of links. When there is no
+    nextCursor field, the ID of the last link is used as the next cursor.
+
+    Args:
+        result: The decoded response of a paginated endpoint
+
+    Returns:
+        Tuple of (links, next cursor), the cursor is None when there are no more pages
+    """
+    if isinstance(result, dict):
+        data = result.get("data", result)
+        links = data.get("links") or []
+
+        if "nextCursor" in data:
+            return links, data["nextCursor"] if links else None
+
+    else:
+        links = result or []
+
+    return links, links[-1].get("id") if links else None
+
+
+def iter_pages(fetch_page: Callable[[Optional[int]], Any], cursor: Optional[int] = None, read_ahead: int = 0) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Lazily follow the cursor of a paginated endpoint, yielding one page of links at a time
+
+    Args:
+        fetch_page: Function fetching the page starting at the given cursor
+        cursor: Cursor of the first page
+        read_ahead: Number of pages fetched in a background thread ahead of the consumer.
+            0 fetches each page only when it's needed. At most read_ahead pages are buffered.
+
+    Yields:
+        Lists of link dictionaries
+
+    Raises:
+        APIError: If one of the requests fails
+    """
+    pages = _follow_cursor(fetch_page, cursor)
+
+    if read_ahead > 0:
+        pages = _read_ahead(pages, read_ahead)
+
+    return pages
+
+
+def iter_items(fetch_page: Callable[[Optional[int]], Any], cursor: Optional[int] = None, read_ahead: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Same as iter_pages, but yields the links one by one
+
+    Yields:
+        Link dictionaries
+    """
+    for page in iter_pages(fetch_page, cursor, read_ahead):
+        yield from page
+
+
+async def aiter_items(fetch_page: Callable[[Optional[int]], Awaitable[Any]], cursor: Optional[int] = None, prefetch: bool = False) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Async version of iter_items
+
+    Args:
+        fetch_page: Coroutine function fetching the page starting at the given cursor
+        cursor: Cursor of the first page
+        prefetch: Whether to start fetching the next page while the current one is consumed
+
+    Yields:
+        Link dictionaries
+    """
+    import asyncio
+    pending = asyncio.ensure_future(fetch_page(cursor))
+
+    try:
+        while pending is not None:
+            links, cursor = split_page(await pending)
+            pending = None
+
+            if prefetch and cursor is not None:
+                pending = asyncio.ensure_future(fetch_page(cursor))
+
+            for link in links:
+                yield link
+
+            if pending is None and cursor is not None:
+                pending = asyncio.ensure_future(fetch_page(cursor))
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+def _follow_cursor(fetch_page: Callable[[Optional[int]], Any], cursor: Optional[int]) -> Iterator[List[Dict[str, Any]]]:
+    """Fetch pages sequentially until the cursor runs out"""
+    while True:
+        links, cursor = split_page(fetch_page(cursor))
+
+        if links:
+            yield links
+
+        if cursor is None:
+            return
+
+
+def _read_ahead(pages: Iterator[List[Dict[str, Any]]], depth: int) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Consume an iterator of pages in a background thread, keeping at most depth pages buffered
+
+    Errors raised by the producer are re-raised in the consumer. If the consumer stops
+    early (break, close, garbage collection), the producer stops after the page it's fetching.
+    """
+    buffer = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for page in pages:
+                if not put(("page", page)):
+                    return
+            put(("end", None))
+        except BaseException as e:
+            put(("error", e))
+
+    producer = threading.Thread(target=produce, name="linkwarden-read-ahead", daemon=True)
+    producer.start()
+
+    try:
+        while True:
+            kind, value = buffer.get()
+            if kind == "end":
+                return
+            if kind == "error":
+                raise value
+            yield value
+    finally:
+        stop.set()
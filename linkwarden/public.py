@@ -1,7 +1,9 @@
 #! -- coding: utf-8 --
 
 from .base import Base
-from typing import Dict, Any, Optional
+from .transport import Transport
+from .pagination import iter_items
+from typing import Dict, Any, Optional, Iterator
 
 class Public(Base):
     """
@@ -12,8 +14,8 @@ class Public(Base):
     If needed, it can safely be initialized with an empty string for the API key
     """
 
-    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1"):
-        super().__init__(api_key, base_url, api_version)
+    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1", transport: Optional[Transport]=None):
+        super().__init__(api_key, base_url, api_version, transport)
         self.public_endpoint = "/public"
 
 
@@ -55,6 +57,33 @@ class Public(Base):
         return self._make_request("GET", f"{self.public_endpoint}/collections/links", params=parameters)
     
 
+    def iter_links_from_collection(self,
+                                   collection_id: int,
+                                   read_ahead: int = 2,
+                                   **filters
+                                   ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all the links of a public collection, following the cursor
+
+        The cursor is the ID of the last link of the previous page, so a page can only be
+        requested once the previous one has arrived. With read_ahead > 0 a background thread
+        keeps fetching the next pages back to back, up to read_ahead pages ahead of the consumer,
+        so the round trips overlap with the processing of the links. Links are yielded in order.
+
+        Args:
+            collection_id: The ID of the collection to get links from (required)
+            read_ahead: Maximum number of pages fetched ahead of the consumer, 0 to fetch each page on demand
+            **filters: Any other parameter of get_links_from_collection (sort, pinnedOnly, searchQueryString, ...)
+
+        Yields:
+            Link dictionaries
+
+        Raises:
+            APIError: If one of the requests fails
+        """
+        return iter_items(lambda cursor: self.get_links_from_collection(collection_id, cursor=cursor, **filters), read_ahead=read_ahead)
+
+
     def get_tags_from_collection(self, collection_id: int) -> Dict[str, Any]:
         """
         Get tags from a specific collection
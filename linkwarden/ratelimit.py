@@ -0,0 +1,147 @@
+#! -- coding: utf-8 --
+
+import threading
+import time
+import weakref
+from typing import Optional
+
+class RateLimiter:
+    """
+    Client-side rate limiter and concurrency governor, used by the transports
+
+    Every request takes a token from a token bucket refilled at `rate` tokens per second
+    (up to `burst` tokens), and holds one of `max_in_flight` slots until its response arrives.
+    Set on the transport, it's shared by every resource of the Api, whatever thread they're called from.
+
+    When adaptive, the rate is halved each time the server answers 429 Too Many Requests, and
+    slowly increased back towards the configured rate after each successful response, so the
+    client settles on the highest rate the server can sustain.
+
+    Args:
+        rate: Maximum requests per second
+        burst: Maximum number of requests that can be sent at once after an idle period, defaults to rate
+        max_in_flight: Maximum number of concurrent requests, None for no limit
+        adaptive: Whether to adapt the rate to the 429 responses
+        min_rate: Lowest rate the adaptive mode can go down to
+        recovery: Fraction of the configured rate added back after each successful response, in adaptive mode
+    """
+    def __init__(self,
+                 rate: float = 10,
+                 burst: Optional[float] = None,
+                 max_in_flight: Optional[int] = None,
+                 adaptive: bool = True,
+                 min_rate: float = 0.5,
+                 recovery: float = 0.02
+                 ):
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.max_in_flight = max_in_flight
+        self.adaptive = adaptive
+        self.min_rate = min(min_rate, rate)
+        self.recovery = recovery
+
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+        self._async_slots = weakref.WeakKeyDictionary()
+
+
+    def acquire(self):
+        """Block until a request can be sent"""
+        if self._slots is not None:
+            self._slots.acquire()
+
+        while True:
+            wait = self._take_token()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+
+    def release(self, status_code: Optional[int] = None):
+        """
+        Signal that a request acquired with acquire() got its response
+
+        Args:
+            status_code: Status of the response, None if the request failed without a response
+        """
+        if self._slots is not None:
+            self._slots.release()
+        self._adapt(status_code)
+
+
+    async def acquire_async(self):
+        """Wait until a request can be sent, without blocking the event loop"""
+        import asyncio
+        slots = self._async_semaphore()
+        if slots is not None:
+            await slots.acquire()
+
+        try:
+            while True:
+                wait = self._take_token()
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+        except BaseException:
+            # Cancelled while waiting for a token, give the slot back
+            if slots is not None:
+                slots.release()
+            raise
+
+
+    def release_async(self, status_code: Optional[int] = None):
+        """Signal that a request acquired with acquire_async() got its response"""
+        slots = self._async_semaphore()
+        if slots is not None:
+            slots.release()
+        self._adapt(status_code)
+
+
+    def _take_token(self) -> float:
+        """Take a token if available, otherwise return the seconds to wait for the next one"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+
+            return (1 - self._tokens) / self.rate
+
+
+    def _adapt(self, status_code: Optional[int]):
+        if not self.adaptive or status_code is None:
+            return
+
+        with self._lock:
+            if status_code == 429:
+                self.rate = max(self.min_rate, self.rate / 2)
+                # Drop the accumulated burst, the server is already overloaded
+                self._tokens = min(self._tokens, 0)
+            elif status_code < 400:
+                self.rate = min(self.max_rate, self.rate + self.recovery * self.max_rate)
+
+
+    def _async_semaphore(self) -> Optional["asyncio.Semaphore"]:
+        """asyncio semaphores are bound to an event loop, so keep one per loop, without keeping the loops alive"""
+        if not self.max_in_flight:
+            return None
+
+        import asyncio
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            slots = self._async_slots.get(loop)
+            if slots is None:
+                # A semaphore can reference its loop, which would keep the key of a closed loop alive
+                for closed in [other for other in self._async_slots if other.is_closed()]:
+                    del self._async_slots[closed]
+                slots = self._async_slots[loop] = asyncio.Semaphore(self.max_in_flight)
+            return slots
@@ -0,0 +1,110 @@
+#! -- coding: utf-8 --
+
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Iterable, Optional
+
+class RetryPolicy:
+    """
+    Retry policy for transient failures, used by the transports
+
+    A request is retried when it fails with a connection error or a timeout, or when the server
+    answers with one of the retry statuses, as long as the method is idempotent. The wait between
+    attempts grows exponentially (backoff_factor * 2 ** attempt, capped to max_backoff) with full
+    jitter, unless the server sends a Retry-After header, which is respected up to max_retry_after.
+
+    Args:
+        max_retries: Maximum number of retries after the first attempt
+        backoff_factor: Base wait in seconds
+        max_backoff: Maximum computed wait between two attempts, in seconds
+        jitter: Whether to randomize the wait between 0 and the computed backoff, to spread the retries of many clients
+        statuses: HTTP statuses worth retrying
+        methods: HTTP methods that can be safely retried
+        deadline: Maximum total time in seconds spent on a request including retries and waits, None for no limit
+        respect_retry_after: Whether to wait as long as the Retry-After header says
+        max_retry_after: Maximum wait in seconds taken from a Retry-After header, longer values are clamped to it
+    """
+    def __init__(self,
+                 max_retries: int = 3,
+                 backoff_factor: float = 0.5,
+                 max_backoff: float = 30,
+                 jitter: bool = True,
+                 statuses: Iterable[int] = (429, 500, 502, 503, 504),
+                 methods: Iterable[str] = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE"),
+                 deadline: Optional[float] = None,
+                 respect_retry_after: bool = True,
+                 max_retry_after: float = 120
+                 ):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(method.upper() for method in methods)
+        self.deadline = deadline
+        self.respect_retry_after = respect_retry_after
+        self.max_retry_after = max_retry_after
+
+
+    def allows(self, method: str, body: Any = None) -> bool:
+        """
+        Whether a request can be retried at all
+
+        Streamed bodies (file objects, generators, encoders) are consumed by the first attempt,
+        so requests sending them are never retried.
+        """
+        if method.upper() not in self.methods:
+            return False
+        return body is None or isinstance(body, (bytes, str, dict, list, tuple))
+
+
+    def retry_status(self, status_code: int) -> bool:
+        """Whether a response status is worth retrying"""
+        return status_code in self.statuses
+
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Seconds to wait before the next attempt
+
+        Args:
+            attempt: Number of the failed attempt, starting from 0
+            retry_after: Value of the Retry-After header, if any
+        """
+        if retry_after and self.respect_retry_after:
+            seconds = self._parse_retry_after(retry_after)
+            if seconds is not None:
+                return min(seconds, self.max_retry_after)
+
+        backoff = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        return random.uniform(0, backoff) if self.jitter else backoff
+
+
+    def can_retry(self, attempt: int, started: float, delay: float) -> bool:
+        """
+        Whether another attempt is allowed
+
+        Args:
+            attempt: Number of the failed attempt, starting from 0
+            started: time.monotonic() of the first attempt
+            delay: Seconds that would be waited before the next attempt
+        """
+        if attempt >= self.max_retries:
+            return False
+        if self.deadline is not None and time.monotonic() - started + delay > self.deadline:
+            return False
+        return True
+
+
+    @staticmethod
+    def _parse_retry_after(value: str) -> Optional[float]:
+        """Retry-After is either a number of seconds or an HTTP date"""
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
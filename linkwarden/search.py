@@ -1,18 +1,21 @@
 #! -- coding: utf-8 --
 
 from .base import Base
-from typing import Dict, Any
+from .transport import Transport
+from .pagination import iter_items
+from .models import Link, Interner, to_models
+from typing import Dict, Any, Optional, Iterator
 
 class Search(Base):
     """
     Class for searching
     """
-    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1"):
-        super().__init__(api_key, base_url, api_version)
+    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1", transport: Optional[Transport]=None):
+        super().__init__(api_key, base_url, api_version, transport)
         self.search_endpoint = "/search"
 
     
-    def search_links(self, query: str, cursor: int = 0) -> Dict[str, Any]:
+    def search_links(self, query: str, cursor: int = 0, as_model: bool = False) -> Dict[str, Any]:
         """
         Search for links
 
@@ -21,6 +24,7 @@ class Search(Base):
             cursor: The cursor to use for pagination
             NOTE: the API documentation features a "sort" int parameter, but its possible values are nowhere to be found. 
             I decided to not include it for now.
+            as_model: Return the links of the page as Link models
 
         Returns:
             Search results
@@ -28,6 +32,30 @@ class Search(Base):
         Raises:
             APIError: If the request fails
         """
-        return self._make_request("GET", f"{self.search_endpoint}", params={"searchQueryString": query, "cursor": cursor})
-    
-    
\ No newline at end of file
+        result = self._make_request("GET", f"{self.search_endpoint}", params={"searchQueryString": query, "cursor": cursor})
+        return self._then(result, lambda page: to_models(page, Link)) if as_model else result
+
+
+    def iter_links(self, query: str, prefetch: bool = False, as_model: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all the links matching a query, following the cursor lazily
+
+        Only the page being consumed is kept in memory (plus the next one when prefetching),
+        so it can walk arbitrarily large result sets.
+
+        Args:
+            query: The query to search for
+            prefetch: Whether to fetch the next page in a background thread while the current one is consumed
+            as_model: Yield Link models, sharing their collections and tags across all the pages
+
+        Yields:
+            Link dictionaries
+
+        Raises:
+            APIError: If one of the requests fails
+        """
+        links = iter_items(lambda cursor: self.search_links(query, cursor or 0), read_ahead=1 if prefetch else 0)
+        if as_model:
+            interner = Interner()
+            return (Link(link, interner) for link in links)
+        return links
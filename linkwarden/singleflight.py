@@ -0,0 +1,132 @@
+#! -- coding: utf-8 --
+"""
+Coalescing of identical concurrent requests ("single-flight")
+
+When several threads (or tasks) send the same idempotent request at the same time, only the
+first one goes to the server, the others wait for it and get the same response. Each caller
+still decodes the response on its own, so they never share the decoded objects.
+"""
+
+import json
+import threading
+from typing import Dict, Any, Callable, Mapping, Optional
+
+# Only these requests are coalesced, and only without a body
+COALESCED_METHODS = ("GET", "HEAD")
+_BODY_ARGUMENTS = ("data", "json", "files", "content")
+
+
+def request_key(method: str, url: str, kwargs: Mapping[str, Any]) -> Optional[str]:
+    """
+    Key identifying a request for coalescing, None if it must not be coalesced
+
+    Two requests have the same key when their method, URL, parameters, headers (so the
+    API key too) and other arguments are the same. Streamed requests are never coalesced,
+    their body can only be read once.
+    """
+    if method.upper() not in COALESCED_METHODS or kwargs.get("stream"):
+        return None
+    if any(kwargs.get(name) is not None for name in _BODY_ARGUMENTS):
+        return None
+
+    return json.dumps([method.upper(), url, _normalize(kwargs)], sort_keys=True, default=repr)
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {str(key): _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Thread-safe single-flight group, used by Transport
+
+    Attributes:
+        shared: Number of calls that got the result of another call instead of running their own
+    """
+    def __init__(self):
+        self.shared = 0
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        """
+        Run func, unless a call with the same key is already running: then wait for it and return its result
+
+        Raises:
+            Whatever func raised, in every caller sharing the call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """
+    Single-flight group for coroutines, used by AsyncTransport
+
+    The shared call runs in its own task, so cancelling one of the callers doesn't cancel it for the others.
+
+    Attributes:
+        shared: Number of calls that got the result of another call instead of running their own
+    """
+    def __init__(self):
+        self.shared = 0
+        self._calls = {}
+
+
+    async def do(self, key: str, func: Callable[[], Any]) -> Any:
+        """Async version of SingleFlight.do, func is a coroutine function"""
+        import asyncio
+
+        # Tasks are bound to their event loop
+        key = (id(asyncio.get_running_loop()), key)
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda _: self._done(key, task))
+        else:
+            self.shared += 1
+
+        return await asyncio.shield(task)
+
+
+    def _done(self, key, task):
+        self._calls.pop(key, None)
+        # Mark the error as retrieved, when all the callers were cancelled nobody else does
+        if not task.cancelled():
+            task.exception()
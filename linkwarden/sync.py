@@ -0,0 +1,225 @@
+#! -- coding: utf-8 --
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+from .index import LocalIndex
+
+ENTITIES = ("links", "collections", "tags")
+
+
+class SyncEngine:
+    """
+    Incremental mirror of the links, collections and tags of an account in a local SQLite store
+
+    Each run writes only what changed since the previous one:
+        - collections and tags are small, they're fetched with one request each and compared
+          by updatedAt, so only the modified rows are written and the missing ones are deleted
+        - links are walked once through the search endpoint and compared by ID and updatedAt,
+          so only the new and edited links are written, and the stored IDs that weren't seen are deleted.
+          The API can't list the links by update date, so this walk covers every link:
+          with new_only=True only the pages above the highest link ID already stored are fetched,
+          which is much cheaper but misses the links edited or deleted on the server
+
+    Args:
+        api: The Api to read from
+        path: Path of the SQLite store, created if missing
+        index: Optional LocalIndex kept up to date with the same changes. An empty index is first
+            filled with the links already stored, so it can be attached to an existing store
+    """
+    def __init__(self, api, path: str, index: Optional[LocalIndex] = None):
+        self.api = api
+        self.path = path
+        self.index = index
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock, self._db:
+            for entity in ENTITIES:
+                self._db.execute(f"CREATE TABLE IF NOT EXISTS {entity} (id INTEGER PRIMARY KEY, updated_at TEXT, collection_id INTEGER, data TEXT)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+
+    def sync(self, new_only: bool = False) -> Dict[str, Dict[str, int]]:
+        """
+        Bring the local store up to date
+
+        Args:
+            new_only: Whether to only fetch the links newer than the ones stored,
+                skipping the detection of edited and deleted links
+
+        Returns:
+            For each of "links", "collections" and "tags", the number of rows "added", "updated" and "removed"
+        """
+        if self.index is not None and len(self.index) == 0 and self.count("links"):
+            self.index.add_links(self.iter("links"))
+
+        summary = {
+            "collections": self._replace_all("collections", self.api.collections.get_collections()),
+            "tags": self._replace_all("tags", self.api.tags.get_tags()),
+            "links": self._sync_links(new_only),
+        }
+        self._set_meta("last_sync", str(time.time()))
+        return summary
+
+
+    def get(self, entity: str, id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get a stored link, collection or tag
+
+        Args:
+            entity: "links", "collections" or "tags"
+            id: ID of the object
+        """
+        self._check_entity(entity)
+        with self._lock:
+            row = self._db.execute(f"SELECT data FROM {entity} WHERE id = ?", (id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+    def iter(self, entity: str, collection_id: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the stored links, collections or tags
+
+        Args:
+            entity: "links", "collections" or "tags"
+            collection_id: Only return the links of this collection (optional)
+        """
+        self._check_entity(entity)
+        sql = f"SELECT data FROM {entity}"
+        params = ()
+        if collection_id is not None:
+            sql += " WHERE collection_id = ?"
+            params = (collection_id,)
+
+        with self._lock:
+            rows = self._db.execute(sql + " ORDER BY id", params).fetchall()
+        for row in rows:
+            yield json.loads(row[0])
+
+
+    def count(self, entity: str) -> int:
+        """Number of stored links, collections or tags"""
+        self._check_entity(entity)
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM {entity}").fetchone()[0]
+
+
+    @property
+    def last_sync(self) -> Optional[float]:
+        """Timestamp of the last successful sync, None if it never ran"""
+        value = self._get_meta("last_sync")
+        return float(value) if value else None
+
+
+    def close(self):
+        self._db.close()
+
+
+    def _sync_links(self, new_only: bool) -> Dict[str, int]:
+        """
+        Walk the links newest first, writing the new and edited ones
+
+        Without new_only all the links are walked and the stored ones that weren't seen are removed,
+        with it the walk stops at the highest ID already stored.
+        """
+        with self._lock:
+            stored = {row[0] for row in self._db.execute("SELECT id FROM links")}
+        watermark = max(stored, default=0)
+
+        summary = {"added": 0, "updated": 0, "removed": 0}
+        batch = []
+        for link in self.api.search.iter_links("", prefetch=True):
+            if new_only and link["id"] <= watermark:
+                break
+            stored.discard(link["id"])
+            batch.append(link)
+            if len(batch) >= 500:
+                self._add_counts(summary, self._upsert("links", batch))
+                batch = []
+
+        self._add_counts(summary, self._upsert("links", batch))
+        if not new_only:
+            summary["removed"] = self._delete("links", stored)
+        return summary
+
+
+    def _replace_all(self, entity: str, objects: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Sync an entity fetched in full: upsert what changed and delete what's missing"""
+        summary = self._upsert(entity, objects)
+        with self._lock:
+            stored = {row[0] for row in self._db.execute(f"SELECT id FROM {entity}")}
+        summary["removed"] = self._delete(entity, stored - {obj["id"] for obj in objects})
+        return summary
+
+
+    def _upsert(self, entity: str, objects: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """Write the objects whose updatedAt changed"""
+        summary = {"added": 0, "updated": 0, "removed": 0}
+        changed = []
+
+        with self._lock, self._db:
+            for obj in objects:
+                row = self._db.execute(f"SELECT updated_at FROM {entity} WHERE id = ?", (obj["id"],)).fetchone()
+                updated_at = obj.get("updatedAt")
+
+                if row is not None and row[0] == updated_at and updated_at is not None:
+                    continue
+
+                summary["added" if row is None else "updated"] += 1
+                self._db.execute(
+                    f"INSERT OR REPLACE INTO {entity} VALUES (?, ?, ?, ?)",
+                    (obj["id"], updated_at, self._collection_id(obj), json.dumps(obj))
+                )
+                changed.append(obj)
+
+        if self.index is not None and entity == "links" and changed:
+            self.index.add_links(changed)
+
+        return summary
+
+
+    def _delete(self, entity: str, ids: Iterable[int]) -> int:
+        ids = list(ids)
+        with self._lock, self._db:
+            self._db.executemany(f"DELETE FROM {entity} WHERE id = ?", [(id,) for id in ids])
+
+        if self.index is not None and entity == "links" and ids:
+            self.index.remove_links(ids)
+
+        return len(ids)
+
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+
+    def _set_meta(self, key: str, value: str):
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+
+    @staticmethod
+    def _collection_id(obj: Dict[str, Any]) -> Optional[int]:
+        if obj.get("collectionId") is not None:
+            return obj["collectionId"]
+        if isinstance(obj.get("collection"), dict):
+            return obj["collection"].get("id")
+        return None
+
+
+    @staticmethod
+    def _add_counts(summary: Dict[str, int], counts: Dict[str, int]):
+        for key, value in counts.items():
+            summary[key] += value
+
+
+    @staticmethod
+    def _check_entity(entity: str):
+        if entity not in ENTITIES:
+            raise ValueError(f"Invalid entity. Valid entities are: {', '.join(ENTITIES)}")
@@ -1,33 +1,41 @@
 #! -- coding: utf-8 --
 
 from .base import Base
-from typing import Dict, Any
+from .transport import Transport
+from .models import Tag, to_models
+from .concurrency import BulkResult
+from typing import Dict, Any, Iterable, Iterator, List, Optional
 
 class Tags(Base):
     """Class for managing tags"""
 
-    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1"):
-        super().__init__(api_key, base_url, api_version)
+    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1", transport: Optional[Transport]=None):
+        super().__init__(api_key, base_url, api_version, transport)
         self.tags_endpoint = "/tags"
 
-    def get_tags(self) -> Dict[str, Any]:
+    def get_tags(self, as_model: bool = False) -> Dict[str, Any]:
         """
         Get all tags
 
+        Args:
+            as_model: Return Tag models instead of dictionaries
+
         Returns:
             List of tag dictionaries
 
         Raises:
             APIError: If the API request fails
         """ 
-        return self._make_request("GET", self.tags_endpoint)
+        result = self._make_request("GET", self.tags_endpoint)
+        return self._then(result, lambda items: to_models(items, Tag)) if as_model else result
 
-    def get_tag(self, tag_id: int) -> Dict[str, Any]:
+    def get_tag(self, tag_id: int, as_model: bool = False) -> Dict[str, Any]:
         """
         Get a tag by ID
 
         Args:
             tag_id: The ID of the tag to get
+            as_model: Return a Tag model instead of a dictionary
 
         Returns:
             Tag dictionary
@@ -35,7 +43,44 @@ class Tags(Base):
         Raises:
             APIError: If the API request fails
         """
-        return self._make_request("GET", f"{self.tags_endpoint}/{tag_id}")
+        result = self._make_request("GET", f"{self.tags_endpoint}/{tag_id}")
+        return self._then(result, lambda item: to_models(item, Tag)) if as_model else result
+
+
+    def get_tags_by_ids(self, ids: Iterable[int], max_workers: int = 8, as_model: bool = False) -> List[BulkResult]:
+        """
+        Get many tags by ID, concurrently
+
+        Repeated IDs are requested only once, and the IDs fresh in the response cache of the
+        transport (if any, sync client only) are served from it. A failed ID (e.g. a deleted tag) doesn't stop the others.
+
+        Args:
+            ids: Iterable of tag IDs
+            max_workers: Maximum number of concurrent requests
+            as_model: Return Tag models instead of dictionaries
+
+        Returns:
+            List of BulkResult in input order, with the ID as item and the tag as result, or the error
+        """
+        return self._get_by_ids(lambda id: self.get_tag(id, as_model), ids, max_workers)
+
+
+    def iter_tags_by_ids(self, ids: Iterable[int], max_workers: int = 8, ordered: bool = False, as_model: bool = False) -> Iterator[BulkResult]:
+        """
+        Same as get_tags_by_ids, but yields the results as they arrive
+
+        The IDs are consumed lazily, so they can come from a generator over millions of them.
+
+        Args:
+            ids: Iterable of tag IDs
+            max_workers: Maximum number of concurrent requests
+            ordered: Whether to yield the results in input order, otherwise as soon as they complete
+            as_model: Return Tag models instead of dictionaries
+
+        Yields:
+            One BulkResult per distinct ID, its index is the position of the first occurrence of the ID in the input
+        """
+        return self._iter_by_ids(lambda id: self.get_tag(id, as_model), ids, max_workers, ordered)
     
     def update_tag(self, tag_id: int, name: str) -> Dict[str, Any]:
         """
@@ -1,6 +1,7 @@
 #! -- coding: utf-8 --
 
 from .base import Base
+from .transport import Transport
 from typing import Dict, Any, Optional
 
 class Tokens(Base):
@@ -8,8 +9,8 @@ class Tokens(Base):
     Class for managing tokens
     """
 
-    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1"):
-        super().__init__(api_key, base_url, api_version)
+    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1", transport: Optional[Transport]=None):
+        super().__init__(api_key, base_url, api_version, transport)
         self.tokens_endpoint = "/tokens"
 
 
@@ -0,0 +1,170 @@
+#! -- coding: utf-8 --
+
+import time
+import requests
+from typing import Iterable, Optional, Tuple, Union
+from .cache import ResponseCache
+from .retry import RetryPolicy
+from .ratelimit import RateLimiter
+from .decoding import JSONDecoder
+from .instrumentation import RequestEvent, RequestHook, TimedHTTPAdapter, body_size, reset_connect_time, last_connect_time
+from .singleflight import SingleFlight, request_key
+
+class Transport:
+    """
+    Pooled HTTP transport shared by all the API classes
+
+    It wraps a single requests.Session, so every resource created by the same Api
+    reuses the same keep-alive connections instead of opening a new TCP + TLS
+    connection for every request.
+
+    Args:
+        pool_connections: Number of per-host connection pools to keep
+        pool_maxsize: Maximum number of connections kept alive for each host
+        pool_block: Whether to block when no free connection is available instead of opening a new one
+        timeout: Default timeout for every request, either seconds or a (connect, read) tuple.
+            None means no timeout, like plain requests
+        cache: Optional ResponseCache shared by all the resources using this transport
+        retry: Optional RetryPolicy for transient failures (connection errors, timeouts, 429/5xx responses)
+        limiter: Optional RateLimiter capping the request rate and the requests in flight of all the resources
+        decoder: JSONDecoder of the responses, the fastest one installed by default
+        hooks: RequestHook objects called before and after every attempt, e.g. a LatencyStats
+        coalesce: Whether identical GET requests sent at the same time by several threads share
+            a single request to the server (and its response)
+    """
+    def __init__(self,
+                 pool_connections: int = 10,
+                 pool_maxsize: int = 10,
+                 pool_block: bool = False,
+                 timeout: Optional[Union[float, Tuple[float, float]]] = None,
+                 cache: Optional[ResponseCache] = None,
+                 retry: Optional[RetryPolicy] = None,
+                 limiter: Optional[RateLimiter] = None,
+                 decoder: Optional[JSONDecoder] = None,
+                 hooks: Optional[Iterable[RequestHook]] = None,
+                 coalesce: bool = True
+                 ):
+        self.timeout = timeout
+        self.cache = cache
+        self.retry = retry
+        self.limiter = limiter
+        self.decoder = decoder if decoder is not None else JSONDecoder()
+        self.hooks = list(hooks or [])
+        self.single_flight = SingleFlight() if coalesce else None
+        self.session = requests.Session()
+
+        adapter = TimedHTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request through the pooled session
+
+        Args:
+            method: HTTP method
+            url: Full URL of the request
+            **kwargs: Any other argument accepted by requests
+
+        Returns:
+            The requests.Response object
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails
+        """
+        kwargs.setdefault("timeout", self.timeout)
+
+        key = request_key(method, url, kwargs) if self.single_flight is not None else None
+        if key is not None:
+            return self.single_flight.do(key, lambda: self._request(method, url, **kwargs))
+
+        return self._request(method, url, **kwargs)
+
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request, retrying it according to the retry policy"""
+        if self.retry is None or "files" in kwargs or not self.retry.allows(method, kwargs.get("data")):
+            return self._send(method, url, **kwargs)
+
+        started = time.monotonic()
+        attempt = 0
+
+        while True:
+            try:
+                response = self._send(method, url, attempt, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                delay = self.retry.delay(attempt)
+                if not self.retry.can_retry(attempt, started, delay):
+                    raise
+            else:
+                if not self.retry.retry_status(response.status_code):
+                    return response
+
+                delay = self.retry.delay(attempt, response.headers.get("Retry-After"))
+                if not self.retry.can_retry(attempt, started, delay):
+                    return response
+                response.close()
+
+            time.sleep(delay)
+            attempt += 1
+
+
+    def _send(self, method: str, url: str, attempt: int = 0, **kwargs) -> requests.Response:
+        """Send a single attempt, through the rate limiter if any"""
+        if self.limiter is None:
+            return self._send_now(method, url, attempt, **kwargs)
+
+        self.limiter.acquire()
+        status_code = None
+        try:
+            response = self._send_now(method, url, attempt, **kwargs)
+            status_code = response.status_code
+            return response
+        finally:
+            self.limiter.release(status_code)
+
+
+    def _send_now(self, method: str, url: str, attempt: int, **kwargs) -> requests.Response:
+        """Send a single attempt, calling the hooks around it"""
+        if not self.hooks:
+            return self.session.request(method, url, **kwargs)
+
+        event = RequestEvent(method, url, attempt, body_size(kwargs))
+        for hook in self.hooks:
+            hook.before_request(event)
+
+        reset_connect_time()
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except Exception as e:
+            event.error = e
+            raise
+        else:
+            event.status_code = response.status_code
+            event.ttfb = response.elapsed.total_seconds()
+            if kwargs.get("stream"):
+                length = response.headers.get("Content-Length")
+                event.response_bytes = int(length) if length and length.isdigit() else None
+            else:
+                event.response_bytes = len(response.content)
+            return response
+        finally:
+            event.total = time.perf_counter() - started
+            event.connect = last_connect_time()
+            for hook in self.hooks:
+                hook.after_request(event)
+
+
+    def close(self):
+        """Close all the pooled connections"""
+        self.session.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args):
+        self.close()
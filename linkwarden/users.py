@@ -1,36 +1,44 @@
 #! -- coding: utf-8 --
 
 from .base import Base
-from typing import Dict, Any
+from .transport import Transport
+from .models import User, to_models
+from .concurrency import BulkResult
+from typing import Dict, Any, Iterable, Iterator, List, Optional
 
 class Users(Base):
     """
     Class for managing users
     For now it only manages basic user data like name, password, email and username.
     """
-    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1"):
-        super().__init__(api_key, base_url, api_version)
+    def __init__(self, api_key: str, base_url: str="https://cloud.linkwarden.app", api_version: str="v1", transport: Optional[Transport]=None):
+        super().__init__(api_key, base_url, api_version, transport)
         self.users_endpoint = "/users"
         
-    def get_users(self):
+    def get_users(self, as_model: bool = False):
         """
         Get all users
         
+        Args:
+            as_model: Return User models instead of dictionaries
+
         Returns:
             List of user dictionaries
             
         Raises:
             APIError: If the API request fails
         """
-        return self._make_request("GET", self.users_endpoint)
+        result = self._make_request("GET", self.users_endpoint)
+        return self._then(result, lambda items: to_models(items, User)) if as_model else result
 
 
-    def get_user(self, user_id: int) -> Dict[str, Any]:
+    def get_user(self, user_id: int, as_model: bool = False) -> Dict[str, Any]:
         """
         Get a user by ID
         
         Args:
             user_id: The user ID to get
+            as_model: Return a User model instead of a dictionary
         
         Returns:
             User dictionary
@@ -38,7 +46,44 @@ class Users(Base):
         Raises:
             APIError: If the API request fails
         """
-        return self._make_request("GET", f"{self.users_endpoint}/{user_id}")
+        result = self._make_request("GET", f"{self.users_endpoint}/{user_id}")
+        return self._then(result, lambda item: to_models(item, User)) if as_model else result
+
+
+    def get_users_by_ids(self, ids: Iterable[int], max_workers: int = 8, as_model: bool = False) -> List[BulkResult]:
+        """
+        Get many users by ID, concurrently
+
+        Repeated IDs are requested only once, and the IDs fresh in the response cache of the
+        transport (if any, sync client only) are served from it. A failed ID (e.g. a deleted user) doesn't stop the others.
+
+        Args:
+            ids: Iterable of user IDs
+            max_workers: Maximum number of concurrent requests
+            as_model: Return User models instead of dictionaries
+
+        Returns:
+            List of BulkResult in input order, with the ID as item and the user as result, or the error
+        """
+        return self._get_by_ids(lambda id: self.get_user(id, as_model), ids, max_workers)
+
+
+    def iter_users_by_ids(self, ids: Iterable[int], max_workers: int = 8, ordered: bool = False, as_model: bool = False) -> Iterator[BulkResult]:
+        """
+        Same as get_users_by_ids, but yields the results as they arrive
+
+        The IDs are consumed lazily, so they can come from a generator over millions of them.
+
+        Args:
+            ids: Iterable of user IDs
+            max_workers: Maximum number of concurrent requests
+            ordered: Whether to yield the results in input order, otherwise as soon as they complete
+            as_model: Return User models instead of dictionaries
+
+        Yields:
+            One BulkResult per distinct ID, its index is the position of the first occurrence of the ID in the input
+        """
+        return self._iter_by_ids(lambda id: self.get_user(id, as_model), ids, max_workers, ordered)
 
 
     def create_user(self, name: str, password: str, email: str="", username: str="", invite: bool=False) -> Dict[str, Any]: